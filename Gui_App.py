@@ -1,14 +1,171 @@
 import customtkinter as ctk
+from tkinter import filedialog
 import serial
-import serial.tools.list_ports
-import time
-import matplotlib
-
-matplotlib.use('TkAgg')  # Set backend before importing pyplot
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+import bisect
+import collections
+import logging
+import os
 import threading
+import time
+
+from acquisition import progress_text
+from anomaly import DEFAULT_SETTINGS, AnomalyMonitor, alarm_text
+from connection import BAUD_RATES, ConnectionManager
+from data_table import DataTableWindow
+from decimation import MinMaxPyramid
+from diagnostics import METRICS, PLOT_RENDER, STORE_APPEND, configure_logging
+from diagnostics_window import DiagnosticsWindow
+from export import EXPORT_FORMATS, ExportError
+from export_window import ExportWindow
+from live_plot import LivePlot
+from multi_device import MultiDeviceAcquisition
+from process_acquisition import AcquisitionProcess
+from sample_store import SampleStore
+from session_replay import SessionReplayer, SessionView
+from spectral import SpectralAnalyzer
+from ui_events import ALARM, ANALYSIS, DONE, PORTS, PROGRESS, SAMPLE, STATUS, EventBus, coalesce
+from session_journal import JOURNAL_EXTENSION, JournalError, JournalReader, JournalWriter, new_journal_path
+
+log = logging.getLogger(__name__)
+
+# matplotlib dominates the start-up time, so it is imported when the first graph is created
+plt = None
+FigureCanvasTkAgg = None
+
+# Live graph refresh rate cap while an experiment is running
+LIVE_PLOT_MAX_FPS = 20
+
+# Sample store column behind each axis option
+AXIS_FIELDS = {
+    "Reading Number": "reading",
+    "Time": "elapsed",
+    "Voltage": "voltage",
+    "Current": "current",
+    "Power": "power",
+    "Energy": "energy",
+    "Power (Rolling Mean)": "power_mean",
+    "Power (Rolling Std)": "power_std",
+    "Power (Rolling Min)": "power_min",
+    "Power (Rolling Max)": "power_max",
+}
+
+# How often the main loop drains worker events; one UI update covers everything queued since
+UI_TICK_MS = 50
+
+# Alarm markers kept per store; older alarms drop off the graph so memory stays bounded
+MAX_ALARM_MARKERS = 500
+
+# Detector settings editable in the Alarm Settings dialog: (label, key)
+ALARM_SETTING_FIELDS = [
+    ("EWMA threshold (std)", "ewma_threshold"),
+    ("EWMA alpha", "ewma_alpha"),
+    ("CUSUM threshold", "cusum_threshold"),
+    ("CUSUM slack (std)", "cusum_slack"),
+    ("Z-score threshold", "zscore_threshold"),
+    ("Z-score window", "zscore_window"),
+    ("Warmup samples", "warmup"),
+]
+
+# Time window shown by the graph (seconds, None for the whole run)
+VIEW_WINDOWS = {
+    "All": None,
+    "Last 1 min": 60,
+    "Last 10 min": 600,
+    "Last 1 h": 3600,
+    "Last 1 day": 86400,
+    "Last 1 week": 604800,
+}
+
+# X axes that only ever increase, so windowing and min/max decimation apply
+MONOTONIC_FIELDS = ("reading", "elapsed")
+
+# Spectral view next to the main graph: menu option -> drawing mode
+SPECTRUM_VIEWS = ["Off", "Spectrum", "Spectrogram"]
+SPECTRUM_SIGNALS = ("voltage", "current", "power")  # analyzed columns; others fall back to voltage
+SPECTRUM_SEGMENT = 64  # samples per Welch segment
+SPECTRUM_REFRESH_S = 1.0  # the spectrum panel is redrawn at most this often while data streams in
+
+# A loaded session's pyramid or spectrum with more rows than this to read is built on a worker thread
+BACKGROUND_ROWS = 1 << 20
+
+# Every session is journaled here so a crash or closed window does not lose the data
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")
+
+# Replay rate choices for a loaded session, "Max" replays as fast as the pipeline takes samples
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "100x": 100.0, "Max": None}
+
+
+def load_matplotlib():
+    """Import pyplot and the Tk canvas on first use, with the TkAgg backend"""
+    global plt, FigureCanvasTkAgg
+    if plt is None:
+        start = time.perf_counter()
+        import matplotlib
+        matplotlib.use('TkAgg')  # Set backend before importing pyplot
+        import matplotlib.pyplot as pyplot
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as canvas_class
+        plt, FigureCanvasTkAgg = pyplot, canvas_class
+        log.debug("matplotlib imported in %.0f ms", (time.perf_counter() - start) * 1000)
+    return plt
+
+
+def list_serial_ports():
+    """Device names of the serial ports on this machine; can take seconds with Bluetooth/virtual ports"""
+    import serial.tools.list_ports
+    ports = serial.tools.list_ports.comports()
+    return [port.device for port in ports] if ports else ["No ports found"]
+
+
+def journal_sinks(channel):
+    """Per-device journal for multi-device sessions"""
+    path = new_journal_path(SESSIONS_DIR, prefix=f"session_{channel.name}")
+    return [JournalWriter(path, metadata={"port": channel.port})]
+
+
+def prepare_series(x_data, y_data, margin=0.05):
+    """Drop points where either coordinate is NaN and compute padded axis limits, vectorized"""
+    n = min(len(x_data), len(y_data))
+    x_data = np.asarray(x_data[:n], dtype=float)
+    y_data = np.asarray(y_data[:n], dtype=float)
+    valid = ~(np.isnan(x_data) | np.isnan(y_data))
+    valid_x = x_data[valid]
+    valid_y = y_data[valid]
+    if len(valid_x) == 0:
+        return valid_x, valid_y, None, None
+    return valid_x, valid_y, padded_limits(valid_x, margin), padded_limits(valid_y, margin)
+
+
+def padded_limits(values, margin=0.05):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    pad = (hi - lo) * margin if hi != lo else 0.1
+    return lo - pad, hi + pad
+
+
+def render_series(store, x_field, y_field, pyramid, window=None, max_points=2000):
+    """(x, y, x_limits) to draw y_field over a monotonic x_field, min/max-decimated to about max_points.
+
+    pyramid is the MinMaxPyramid of y_field, kept by the caller between calls and
+    brought up to date here. window limits the series to the last `window`
+    seconds; x_limits is None for the whole run.
+    """
+    samples = store.view()
+    x_data, y_data = samples[x_field], samples[y_field]
+    n = len(x_data)
+    pyramid.update(y_data)
+    start, limits = 0, None
+    if window:
+        elapsed = samples["elapsed"]
+        end_time = elapsed[n - 1]
+        # bisect reads O(log n) items, np.searchsorted would copy the strided column first
+        start = bisect.bisect_left(elapsed, end_time - window)
+        if x_field == "elapsed":
+            limits = (end_time - window, end_time)
+        else:
+            limits = (x_data[start], x_data[n - 1]) if n - 1 > start else (x_data[start] - 1, x_data[start] + 1)
+    rows, y_values = pyramid.envelope(y_data, start, n, max_points)
+    x_values = x_data[rows.astype(np.int64)].astype(float)
+    return x_values, y_values, limits
 
 
 # --- Main App Class ---
@@ -20,12 +177,32 @@ class MonitoringApp(ctk.CTk):
         ctk.set_appearance_mode("Dark")
 
         # --- App state variables ---
-        self.arduino = None
+        self.connections = {}  # port -> ConnectionManager, kept open between experiments
+        self.acquisition_process = None  # AcquisitionProcess holding a port, in separate-process mode
+        self.process_run = None  # the acquisition process while it runs an experiment
+        self._process_readings = None
         self.is_monitoring = False
-        self.voltages_data = []  # Store data here to be accessible by other functions
-        self.current_data = []  # Store current data
-        self.time_data = []  # Store time data
-        self.readings_data = []  # Store reading numbers
+        self.store = SampleStore()  # Columnar sample arrays, shared by the graph and the data table
+        self._series_cache = {}  # (x_axis, y_axis) -> prepared plot series for the current store version
+        self._series_cache_key = None
+        self.selected_ports = []  # ports picked for multi-device mode
+        self.device_stores = {}  # port -> SampleStore of the current multi-device session
+        self.events = EventBus()  # worker threads -> Tk main loop
+        self.status_lines = {}  # status source (None or device port) -> (text, color)
+        self._plot_dirty = False
+        self.diagnostics_window = None
+        self.detector_settings = dict(DEFAULT_SETTINGS)
+        self.alarms = {}  # store -> deque of the newest anomaly.Alarm objects
+        self.session = None  # JournalReader of the loaded session, if any
+        self.available_ports = []  # result of the last background port scan
+        self.spectral = SpectralAnalyzer(segment=SPECTRUM_SEGMENT)
+        self.pyramid = None  # min/max decimation of the plotted Y column
+        self._pyramid_key = None  # (store, field) the pyramid was built for
+        self._analyses_running = set()  # keys of the analyses being built on worker threads
+        self.active_run = None  # engine, multi-device acquisition or replayer that Stop should end
+        self._stop_requested = False
+        self._spectrum_drawn = 0.0
+        self._port_scan_running = False
 
         # --- Main Layout ---
         self.grid_columnconfigure(0, weight=1, minsize=240)
@@ -54,12 +231,28 @@ class MonitoringApp(ctk.CTk):
         self.setup_controls()
         self.setup_graph_controls()
 
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(UI_TICK_MS, self.process_events)
+        self.update_com_ports()  # the menu is filled in when the background scan finishes
+
+    def on_close(self):
+        """Stop any run and release the serial ports before the window goes away"""
+        if self.active_run is not None:
+            self.active_run.stop()
+        for connection in self.connections.values():
+            connection.close()
+        self.connections = {}
+        if self.acquisition_process is not None:
+            self.acquisition_process.close()
+            self.acquisition_process = None
+        self.destroy()
+
     def __del__(self):
         """Cleanup when app is destroyed"""
         try:
             if hasattr(self, 'canvas'):
                 self.canvas.get_tk_widget().destroy()
-            if hasattr(self, 'fig'):
+            if hasattr(self, 'fig') and plt is not None:
                 plt.close(self.fig)
         except:
             pass
@@ -73,17 +266,32 @@ class MonitoringApp(ctk.CTk):
         # ... (same as before) ...
         self.label_com = ctk.CTkLabel(self.control_frame, text="COM Port:")
         self.label_com.pack(pady=(10, 0))
-        available_ports = self.get_available_ports()
-        self.com_port_menu = ctk.CTkOptionMenu(self.control_frame, values=available_ports)
+        self.com_port_menu = ctk.CTkOptionMenu(self.control_frame, values=["Searching..."], state="disabled")
         self.com_port_menu.pack()
+        self.baud_menu = ctk.CTkOptionMenu(self.control_frame, values=[f"{rate} baud" for rate in BAUD_RATES])
+        self.baud_menu.set(f"{BAUD_RATES[0]} baud")
+        self.baud_menu.pack(pady=(5, 0))
         self.refresh_button = ctk.CTkButton(self.control_frame, text="Refresh Ports", command=self.update_com_ports)
         self.refresh_button.pack(pady=5)
 
+        # Multi-device mode: several rigs acquired concurrently
+        self.devices_button = ctk.CTkButton(self.control_frame, text="Select Devices...",
+                                            command=self.open_device_selector)
+        self.devices_button.pack(pady=5)
+        self.devices_label = ctk.CTkLabel(self.control_frame, text="Single device", text_color="gray")
+        self.devices_label.pack()
+
         # Number of Readings Input
         self.label_readings = ctk.CTkLabel(self.control_frame, text="Number of Readings:")
         self.label_readings.pack(pady=(20, 0))
         self.readings_entry = ctk.CTkEntry(self.control_frame, placeholder_text="e.g., 10")
         self.readings_entry.pack()
+        self.continuous_checkbox = ctk.CTkCheckBox(self.control_frame, text="Run until stopped",
+                                                   command=self.on_continuous_toggle)
+        self.continuous_checkbox.pack(pady=(5, 0))
+        # Serial reads in a child process are not held up by redraws in this one
+        self.process_checkbox = ctk.CTkCheckBox(self.control_frame, text="Separate process")
+        self.process_checkbox.pack(pady=(5, 0))
 
         # Stabilization Time Input
         self.label_stabilize = ctk.CTkLabel(self.control_frame, text="Stabilization Time (s):")
@@ -94,16 +302,49 @@ class MonitoringApp(ctk.CTk):
         # Start Button
         self.start_button = ctk.CTkButton(self.control_frame, text="Start Experiment",
                                           command=self.start_experiment_thread)
-        self.start_button.pack(pady=20)
+        self.start_button.pack(pady=(20, 5))
+        self.stop_button = ctk.CTkButton(self.control_frame, text="Stop", command=self.stop_acquisition,
+                                         fg_color="firebrick", hover_color="darkred", state="disabled")
+        self.stop_button.pack(pady=(0, 10))
 
         # --- NEW: Show Data Button ---
         self.show_data_button = ctk.CTkButton(self.control_frame, text="Show Data Table", command=self.show_data_window,
                                               state="disabled")
-        self.show_data_button.pack(pady=10)
-
-        # Status Bar
+        self.show_data_button.pack(pady=(10, 5))
+        self.export_button = ctk.CTkButton(self.control_frame, text="Export Data...", command=self.export_data,
+                                           state="disabled")
+        self.export_button.pack(pady=(0, 10))
+
+        # Recorded sessions: browse a journal or replay it through the live pipeline
+        self.session_frame = ctk.CTkFrame(self.control_frame, fg_color="transparent")
+        self.session_frame.pack(pady=5)
+        self.load_session_button = ctk.CTkButton(self.session_frame, text="Load Session...", width=120,
+                                                 command=self.load_session)
+        self.load_session_button.grid(row=0, column=0, columnspan=2, pady=(0, 5))
+        self.replay_button = ctk.CTkButton(self.session_frame, text="Replay", width=70, command=self.start_replay,
+                                           state="disabled")
+        self.replay_button.grid(row=1, column=0, padx=(0, 5))
+        self.replay_speed_menu = ctk.CTkOptionMenu(self.session_frame, values=list(REPLAY_SPEEDS), width=70)
+        self.replay_speed_menu.set("10x")
+        self.replay_speed_menu.grid(row=1, column=1)
+
+        # Online anomaly detection on V/I/P
+        self.detect_checkbox = ctk.CTkCheckBox(self.control_frame, text="Anomaly Detection")
+        self.detect_checkbox.select()
+        self.detect_checkbox.pack(pady=(5, 0))
+        self.alarm_settings_button = ctk.CTkButton(self.control_frame, text="Alarm Settings...",
+                                                   command=self.open_alarm_settings, fg_color="gray30")
+        self.alarm_settings_button.pack(pady=5)
+
+        self.diagnostics_button = ctk.CTkButton(self.control_frame, text="Diagnostics", command=self.show_diagnostics,
+                                                fg_color="gray30")
+        self.diagnostics_button.pack(pady=5)
+
+        # Status Bar (the alarm line sits just above the status line)
         self.status_label = ctk.CTkLabel(self.control_frame, text="Status: Idle", text_color="gray")
         self.status_label.pack(side="bottom", fill="x", pady=10, padx=10)
+        self.alarm_label = ctk.CTkLabel(self.control_frame, text="", text_color="orange", wraplength=220)
+        self.alarm_label.pack(side="bottom", fill="x", padx=10)
 
     def setup_graph_controls(self):
         # Graph selection section
@@ -122,7 +363,9 @@ class MonitoringApp(ctk.CTk):
         self.x_axis_label = ctk.CTkLabel(self.dropdown_frame, text="X-Axis:", font=ctk.CTkFont(size=14, weight="bold"))
         self.x_axis_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
 
-        self.x_axis_options = ["Reading Number", "Time", "Voltage", "Current"]
+        self.x_axis_options = ["Reading Number", "Time", "Voltage", "Current", "Power", "Energy",
+                               "Power (Rolling Mean)", "Power (Rolling Std)", "Power (Rolling Min)",
+                               "Power (Rolling Max)"]
         self.x_axis_menu = ctk.CTkOptionMenu(
             self.dropdown_frame,
             values=self.x_axis_options,
@@ -135,7 +378,9 @@ class MonitoringApp(ctk.CTk):
         self.y_axis_label = ctk.CTkLabel(self.dropdown_frame, text="Y-Axis:", font=ctk.CTkFont(size=14, weight="bold"))
         self.y_axis_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
 
-        self.y_axis_options = ["Voltage", "Current", "Reading Number", "Time"]
+        self.y_axis_options = ["Voltage", "Current", "Power", "Energy", "Power (Rolling Mean)",
+                               "Power (Rolling Std)", "Power (Rolling Min)", "Power (Rolling Max)",
+                               "Reading Number", "Time"]
         self.y_axis_menu = ctk.CTkOptionMenu(
             self.dropdown_frame,
             values=self.y_axis_options,
@@ -144,6 +389,51 @@ class MonitoringApp(ctk.CTk):
         self.y_axis_menu.set("Voltage")
         self.y_axis_menu.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
 
+        # Device selection (multi-device sessions)
+        self.device_label = ctk.CTkLabel(self.dropdown_frame, text="Device:", font=ctk.CTkFont(size=14, weight="bold"))
+        self.device_label.grid(row=2, column=0, padx=10, pady=10, sticky="w")
+
+        self.device_menu = ctk.CTkOptionMenu(
+            self.dropdown_frame,
+            values=["-"],
+            command=self.on_device_change,
+            state="disabled"
+        )
+        self.device_menu.grid(row=2, column=1, padx=10, pady=10, sticky="ew")
+
+        # Time range of a loaded session to show, only that part of the recording is read
+        self.range_label = ctk.CTkLabel(self.dropdown_frame, text="Range (s):", font=ctk.CTkFont(size=14, weight="bold"))
+        self.range_label.grid(row=3, column=0, padx=10, pady=10, sticky="w")
+
+        self.range_entry = ctk.CTkEntry(self.dropdown_frame, placeholder_text="all, or e.g. 60-120")
+        self.range_entry.grid(row=3, column=1, padx=10, pady=10, sticky="ew")
+        self.range_entry.bind("<Return>", lambda event: self.apply_session_range())
+        self.range_entry.configure(state="disabled")
+
+        # Time window of the graph, long runs are min/max decimated to the graph width
+        self.view_label = ctk.CTkLabel(self.dropdown_frame, text="View:", font=ctk.CTkFont(size=14, weight="bold"))
+        self.view_label.grid(row=5, column=0, padx=10, pady=10, sticky="w")
+
+        self.view_menu = ctk.CTkOptionMenu(
+            self.dropdown_frame,
+            values=list(VIEW_WINDOWS),
+            command=self.on_axis_change
+        )
+        self.view_menu.set("All")
+        self.view_menu.grid(row=5, column=1, padx=10, pady=10, sticky="ew")
+
+        # Windowed FFT of the Y-axis signal, drawn beside the main graph
+        self.spectrum_label = ctk.CTkLabel(self.dropdown_frame, text="Spectrum:", font=ctk.CTkFont(size=14, weight="bold"))
+        self.spectrum_label.grid(row=4, column=0, padx=10, pady=10, sticky="w")
+
+        self.spectrum_menu = ctk.CTkOptionMenu(
+            self.dropdown_frame,
+            values=SPECTRUM_VIEWS,
+            command=self.on_spectrum_change
+        )
+        self.spectrum_menu.set("Off")
+        self.spectrum_menu.grid(row=4, column=1, padx=10, pady=10, sticky="ew")
+
         # Configure column weights for better layout
         self.dropdown_frame.grid_columnconfigure(1, weight=1)
 
@@ -159,136 +449,515 @@ class MonitoringApp(ctk.CTk):
     def on_axis_change(self, value):
         """Callback when axis selection changes"""
         # Update graph immediately if data exists and canvas is available
-        if hasattr(self, 'canvas') and hasattr(self, 'ax1') and self.voltages_data:
+        if hasattr(self, 'canvas') and hasattr(self, 'ax1') and len(self.store):
             try:
                 # Schedule plot update in main thread
                 self.after(0, self.plot_results)
-                print(f"Graph update scheduled: X={self.x_axis_menu.get()}, Y={self.y_axis_menu.get()}")
+                log.debug("Graph update scheduled: X=%s, Y=%s", self.x_axis_menu.get(), self.y_axis_menu.get())
             except Exception as e:
-                print(f"Error scheduling graph update: {e}")
+                log.error("Error scheduling graph update: %s", e)
         else:
-            print(f"Axis changed but no data to plot yet: X={self.x_axis_menu.get()}, Y={self.y_axis_menu.get()}")
+            log.debug("Axis changed but no data to plot yet: X=%s, Y=%s", self.x_axis_menu.get(), self.y_axis_menu.get())
+
+    def on_continuous_toggle(self):
+        """The reading count does not apply when the run lasts until Stop is pressed"""
+        self.readings_entry.configure(state="disabled" if self.continuous_checkbox.get() else "normal")
+
+    def stop_acquisition(self):
+        """Ask the running acquisition or replay to finish; the usual done path follows"""
+        if not self.is_monitoring:
+            return
+        self._stop_requested = True
+        if self.active_run is not None:
+            self.active_run.stop()
+        self.stop_button.configure(state="disabled")
+        self.status_lines[None] = ("Status: Stopping...", "yellow")
+        self.render_status()
+
+    def on_spectrum_change(self, value):
+        """Rebuild the figure with or without the spectrum panel"""
+        if not hasattr(self, 'canvas'):
+            return
+        self.clear_graph_area()
+        self.start_live_plot()
+        if len(self.store):
+            self.plot_results()
+
+    def on_device_change(self, port):
+        """Show the selected device's samples in the graph and data table"""
+        if port not in self.device_stores:
+            return
+        self.store = self.device_stores[port]
+        if hasattr(self, 'live_plot'):
+            self.plot_results()
+
+    def load_session(self):
+        """Open a recorded journal; it is memory-mapped, not read into memory"""
+        if self.is_monitoring:
+            return
+        path = filedialog.askopenfilename(parent=self, title="Load Session",
+                                          initialdir=SESSIONS_DIR if os.path.isdir(SESSIONS_DIR) else None,
+                                          filetypes=[("Session journals", f"*{JOURNAL_EXTENSION}"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            reader = JournalReader(path)
+        except (OSError, JournalError) as e:
+            self.status_label.configure(text=f"Error: Could not load session. {e}", text_color="red")
+            return
+
+        self.session = reader
+        self.device_stores = {}
+        self.device_menu.configure(values=["-"], state="disabled")
+        self.device_menu.set("-")
+        self.alarms = {}
+        self.alarm_label.configure(text="")
+        self.range_entry.configure(state="normal")
+        self.range_entry.delete(0, ctk.END)
+        self.replay_button.configure(state="normal")
+        self.store = SessionView(reader)
+        self.show_session()
+        self.status_label.configure(text=f"Status: Loaded {os.path.basename(path)} ({len(reader)} readings, "
+                                         f"{self.store.duration_s:.1f}s)", text_color="cyan")
+
+    def apply_session_range(self):
+        """Show only [start, end) seconds of the loaded session, e.g. "60-120"; empty shows everything"""
+        if self.session is None or self.is_monitoring:
+            return
+        text = self.range_entry.get().strip()
+        try:
+            if text.lower() in ("", "all"):
+                start, end = None, None
+            else:
+                start_text, _, end_text = text.partition("-")
+                start = float(start_text) if start_text.strip() else None
+                end = float(end_text) if end_text.strip() else None
+                if start is not None and end is not None and end <= start:
+                    raise ValueError("end must be after start")
+        except ValueError as e:
+            self.status_label.configure(text=f"Error: Invalid range. {e}", text_color="red")
+            return
+        self.store = SessionView(self.session, start, end)
+        self.show_session()
+        self.status_label.configure(text=f"Status: Showing {len(self.store)} readings", text_color="cyan")
+
+    def show_session(self):
+        """Plot the current session view through the normal results path"""
+        self.clear_graph_area()
+        self.start_live_plot()
+        self.plot_results()
+        self.show_data_button.configure(state="normal" if len(self.store) else "disabled")
+        self.export_button.configure(state="normal" if len(self.store) else "disabled")
+
+    def start_replay(self):
+        """Play the shown range of the loaded session back through the live pipeline"""
+        if self.is_monitoring or self.session is None:
+            return
+        source = self.store.view() if isinstance(self.store, SessionView) else self.session.view()
+        detectors = AnomalyMonitor(self.detector_settings) if self.detect_checkbox.get() else None
+        self.store = SampleStore()
+        replayer = SessionReplayer(source, speed=REPLAY_SPEEDS[self.replay_speed_menu.get()],
+                                   on_sample=self.on_sample, on_status=self.post_status,
+                                   on_progress=self.post_progress, detectors=detectors, on_alarm=self.on_alarm)
+
+        log.info("Starting session replay")
+        self.is_monitoring = True
+        self.status_lines = {}
+        self.alarms = {}
+        self.alarm_label.configure(text="")
+        self.active_run = replayer
+        self._stop_requested = False
+        self.start_button.configure(state="disabled", text="Replaying...")
+        self.stop_button.configure(state="normal")
+        self.replay_button.configure(state="disabled")
+        self.show_data_button.configure(state="disabled")
+        self.export_button.configure(state="disabled")
+        self.clear_graph_area()
+        self.start_live_plot()
+        threading.Thread(target=self.run_replay, args=(replayer,), daemon=True).start()
+
+    def run_replay(self, replayer):
+        succeeded = False
+        try:
+            replayer.run()
+            self.post_status("Status: Replay Complete!", "lime")
+            succeeded = True
+        except Exception as e:
+            log.exception("Replay failed")
+            self.post_status(f"Error: {str(e)}", "red")
+        finally:
+            self.events.publish(DONE, None, succeeded)
+
+    def open_device_selector(self):
+        """Let the user pick several ports to acquire from at the same time"""
+        selector = ctk.CTkToplevel(self)
+        selector.title("Select Devices")
+        selector.geometry("300x400")
+        selector.transient(self)
+
+        ctk.CTkLabel(selector, text="Acquire from these ports concurrently:").pack(pady=10)
+        port_frame = ctk.CTkScrollableFrame(selector)
+        port_frame.pack(expand=True, fill="both", padx=10)
+        checkboxes = {}
+        for port in self.available_ports:
+            if port == "No ports found":
+                continue
+            checkbox = ctk.CTkCheckBox(port_frame, text=port)
+            if port in self.selected_ports:
+                checkbox.select()
+            checkbox.pack(anchor="w", pady=2)
+            checkboxes[port] = checkbox
+
+        def apply():
+            self.selected_ports = [port for port, checkbox in checkboxes.items() if checkbox.get()]
+            if len(self.selected_ports) > 1:
+                self.devices_label.configure(text=f"{len(self.selected_ports)} devices selected", text_color="cyan")
+            else:
+                self.devices_label.configure(text="Single device", text_color="gray")
+                if self.selected_ports:
+                    self.com_port_menu.set(self.selected_ports[0])
+            selector.destroy()
+
+        ctk.CTkButton(selector, text="OK", command=apply).pack(pady=10)
+
+    def open_alarm_settings(self):
+        """Edit the anomaly detector thresholds used by the next experiment"""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Alarm Settings")
+        dialog.geometry("320x400")
+        dialog.transient(self)
+
+        entries = {}
+        for row, (label, key) in enumerate(ALARM_SETTING_FIELDS):
+            ctk.CTkLabel(dialog, text=label).grid(row=row, column=0, padx=10, pady=5, sticky="w")
+            entry = ctk.CTkEntry(dialog, width=90)
+            entry.insert(0, f"{self.detector_settings[key]:g}")
+            entry.grid(row=row, column=1, padx=10, pady=5)
+            entries[key] = entry
+        error_label = ctk.CTkLabel(dialog, text="", text_color="red")
+        error_label.grid(row=len(ALARM_SETTING_FIELDS) + 1, column=0, columnspan=2)
+
+        def apply():
+            try:
+                settings = {key: float(entry.get()) for key, entry in entries.items()}
+                AnomalyMonitor(settings)  # validates the values
+                if settings["zscore_window"] < 1 or settings["warmup"] < 0:
+                    raise ValueError("Window and warmup must not be negative")
+            except ValueError as e:
+                error_label.configure(text=f"Invalid setting: {e}")
+                return
+            settings["zscore_window"] = int(settings["zscore_window"])
+            settings["warmup"] = int(settings["warmup"])
+            self.detector_settings = settings
+            dialog.destroy()
+
+        ctk.CTkButton(dialog, text="OK", command=apply).grid(row=len(ALARM_SETTING_FIELDS), column=0,
+                                                             columnspan=2, pady=10)
 
     def start_experiment_thread(self):
         if self.is_monitoring:
-            print("Experiment already running, ignoring start request")
+            log.info("Experiment already running, ignoring start request")
             return
-        print("Starting new experiment thread")
-        experiment_thread = threading.Thread(target=self.run_experiment, daemon=True)
-        experiment_thread.start()
 
-    def run_experiment(self):
+        # Read the widgets here on the main thread, the worker never touches Tk directly
+        try:
+            port = self.com_port_menu.get()
+            baudrate = int(self.baud_menu.get().split()[0])
+            readings = None if self.continuous_checkbox.get() else int(self.readings_entry.get())
+            stabilize_time = float(self.stabilize_entry.get())
+            if (readings is not None and readings <= 0) or stabilize_time < 0: raise ValueError("Inputs must be positive")
+        except (ValueError, TypeError) as e:
+            self.status_label.configure(text=f"Error: Invalid input. {e}", text_color="red")
+            return
+
+        # Detector settings are captured now, each device gets its own AnomalyMonitor
+        detector_settings = dict(self.detector_settings) if self.detect_checkbox.get() else None
+        detector_factory = (lambda channel: AnomalyMonitor(detector_settings)) if detector_settings else None
+
+        if len(self.selected_ports) > 1:
+            connections = {port: self.connection_for(port, baudrate) for port in self.selected_ports}
+            try:
+                acquisition = MultiDeviceAcquisition(self.selected_ports, readings=readings,
+                                                     stabilize_time=stabilize_time, sink_factory=journal_sinks,
+                                                     connection_factory=lambda channel: connections[channel.port],
+                                                     on_sample=self.on_device_sample,
+                                                     on_status=self.post_device_status,
+                                                     on_progress=self.post_device_progress,
+                                                     store_samples=False,
+                                                     detector_factory=detector_factory,
+                                                     on_alarm=self.on_device_alarm)
+            except ValueError as e:
+                self.status_label.configure(text=f"Error: {e}", text_color="red")
+                return
+            self.device_stores = {channel.port: channel.store for channel in acquisition.channels}
+            self.device_menu.configure(values=list(self.device_stores), state="normal")
+            self.device_menu.set(acquisition.channels[0].port)
+            self.store = acquisition.channels[0].store
+            self.active_run = acquisition
+            target, args = self.run_multi_experiment, (acquisition,)
+        else:
+            self.device_stores = {}
+            self.device_menu.configure(values=["-"], state="disabled")
+            self.device_menu.set("-")
+            self.store = SampleStore()  # Fresh store, the previous one may still be shown in a data window
+            if self.process_checkbox.get():
+                try:
+                    worker = self.acquisition_process_for(port, baudrate)
+                except OSError as e:
+                    self.status_label.configure(text=f"Error: Could not start the acquisition process. {e}",
+                                                text_color="red")
+                    return
+                worker.start_run(readings, stabilize_time, new_journal_path(SESSIONS_DIR), detector_settings)
+                self.active_run = self.process_run = worker
+                self._process_readings = readings
+                target = None  # process_events pumps the child's samples and messages
+            else:
+                detectors = detector_factory(None) if detector_factory else None
+                self.active_run = None  # the worker creates the engine
+                target, args = self.run_experiment, (self.connection_for(port, baudrate), readings, stabilize_time,
+                                                     detectors)
+
+        log.info("Starting new experiment thread")
+        self.session = None
+        self.range_entry.configure(state="disabled")
+        self.replay_button.configure(state="disabled")
         self.is_monitoring = True
+        self.status_lines = {}
+        self.alarms = {}
+        self.alarm_label.configure(text="")
+        self._stop_requested = False
         self.start_button.configure(state="disabled", text="Running...")
+        self.stop_button.configure(state="normal")
         self.show_data_button.configure(state="disabled")  # Disable during run
+        self.export_button.configure(state="disabled")
+        self.clear_graph_area()
+        self.start_live_plot()
+        if target is not None:
+            experiment_thread = threading.Thread(target=target, args=args, daemon=True)
+            experiment_thread.start()
+
+    def connection_for(self, port, baudrate):
+        """The open connection to port, created on first use - MUST be called from main thread"""
+        if self.acquisition_process is not None and self.acquisition_process.port == port:
+            self.acquisition_process.close()  # the port can only be open in one process
+            self.acquisition_process = None
+        connection = self.connections.get(port)
+        if connection is None:
+            connection = self.connections[port] = ConnectionManager(port, baudrate=baudrate)
+        else:
+            connection.set_baudrate(baudrate)
+        return connection
+
+    def acquisition_process_for(self, port, baudrate):
+        """The acquisition process holding port, started on first use - MUST be called from main thread"""
+        worker = self.acquisition_process
+        if worker is not None and (worker.port != port or worker.baudrate != baudrate or not worker.alive):
+            worker.close()
+            worker = self.acquisition_process = None
+        if worker is None:
+            connection = self.connections.pop(port, None)
+            if connection is not None:
+                connection.close()  # the child opens the port itself
+            worker = self.acquisition_process = AcquisitionProcess(port, baudrate=baudrate)
+        return worker
+
+    def pump_acquisition_process(self):
+        """Copy the child's new samples into the store and turn its messages into UI events"""
+        worker = self.process_run
+        messages, records = worker.poll()
+        if len(records):
+            start = time.perf_counter_ns()
+            self.store.extend(records)  # the one copy out of shared memory
+            METRICS.observe(STORE_APPEND, time.perf_counter_ns() - start)
+            self._plot_dirty = True
+            self.events.publish(PROGRESS, None, len(self.store), self._process_readings)
+        del records
+        for kind, *payload in messages:
+            if kind == STATUS:
+                self.events.publish(STATUS, None, *payload)
+            elif kind == ALARM:
+                self.events.publish(ALARM, self.store, *payload)
+            elif kind == DONE:
+                succeeded, journal_path = payload
+                if journal_path:
+                    log.info("Session saved to %s", journal_path)
+                self.process_run = None
+                self.events.publish(DONE, None, succeeded)
+        if self.process_run is worker and not worker.alive:
+            log.error("Acquisition process exited during a run")
+            self.process_run = None
+            self.events.publish(STATUS, None, "Error: Acquisition process exited.", "red")
+            self.events.publish(DONE, None, False)
+
+    # --- Worker -> UI events (workers publish, the main loop drains on a tick) ---
+    def post_status(self, text, color):
+        """Update the status label from any thread"""
+        self.events.publish(STATUS, None, text, color)
+
+    def post_progress(self, count, total):
+        self.events.publish(PROGRESS, None, count, total)
+
+    def post_device_status(self, channel, text, color):
+        self.events.publish(STATUS, channel.port, text, color)
+
+    def post_device_progress(self, channel, count, total):
+        self.events.publish(PROGRESS, channel.port, count, total)
+
+    def on_sample(self, sample):
+        """Engine callback: queue one reading for the current store"""
+        self.events.publish(SAMPLE, self.store, sample)
+
+    def on_device_sample(self, channel, sample):
+        self.events.publish(SAMPLE, channel.store, sample)
+
+    def scan_ports(self):
+        """Port discovery worker, publishes the port list when done"""
+        try:
+            ports = list_serial_ports()
+        except Exception as e:
+            log.error("Port discovery failed: %s", e)
+            ports = ["No ports found"]
+        self.events.publish(PORTS, ports)
 
-        # Clear previous data but keep graph structure
-        self.voltages_data = []  # Clear previous data
-        self.current_data = []  # Clear previous current data
-        self.time_data = []  # Clear previous time data
-        self.readings_data = []  # Clear previous readings data
+    def on_alarm(self, alarm):
+        """Detector callback: queue one alarm for the current store"""
+        self.events.publish(ALARM, self.store, alarm)
 
-        # Schedule graph area clearing in main thread instead of doing it here
-        self.after(0, self.clear_graph_area)
+    def on_device_alarm(self, channel, alarm):
+        self.events.publish(ALARM, channel.store, alarm)
 
+    def process_events(self):
+        """Drain and coalesce worker events, then apply them in one UI update - runs on the main thread"""
         try:
-            port = self.com_port_menu.get()
-            readings = int(self.readings_entry.get())
-            stabilize_time = float(self.stabilize_entry.get())
-            if readings <= 0 or stabilize_time < 0: raise ValueError("Inputs must be positive")
-
-            self.status_label.configure(text="Status: Connecting...", text_color="yellow")
-            self.arduino = serial.Serial(port=port, baudrate=9600, timeout=2)
-            time.sleep(2)
-
-            # --- BUG FIX: Read and discard any startup messages from Arduino ---
-            self.arduino.flushInput()  # Clear the input buffer
-
-            # Read startup messages until we get to the calibration message
-            while True:
-                line = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                print(f"Arduino startup message: '{line}'")
-                if "Calibrated Current Sensor Offset:" in line:
-                    break
-                if not line:  # If we get empty lines, continue
-                    continue
-
-            # Don't send readings count - Arduino runs continuously
-            # self.arduino.write(f"{readings}\n".encode())  # Commented out
-
-            self.status_label.configure(text=f"Status: Stabilizing for {stabilize_time}s...", text_color="cyan")
-            time.sleep(stabilize_time)
-
-            for i in range(readings):
-                self.status_label.configure(text=f"Status: Taking reading {i + 1}/{readings}...", text_color="green")
-
-                # Read voltage line
-                voltage_line = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                print(f"Received voltage line: '{voltage_line}'")
-
-                # Read current line
-                current_line = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                print(f"Received current line: '{current_line}'")
-
-                # Read separator line
-                separator_line = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                print(f"Received separator line: '{separator_line}'")
-
-                # Parse voltage - look for it in any of the three lines
-                voltage_value = np.nan
-                for line in [voltage_line, current_line, separator_line]:
-                    if "Input Voltage:" in line:
-                        try:
-                            value_str = line.split(':')[1].strip().replace(' V', '')
-                            voltage_value = float(value_str)
-                            print(f"Parsed voltage: {voltage_value}")
-                            break
-                        except (ValueError, IndexError):
-                            print(f"Failed to parse voltage from: '{line}'")
-
-                # Parse current - look for it in any of the three lines
-                current_value = np.nan
-                for line in [voltage_line, current_line, separator_line]:
-                    if "Current:" in line:
-                        try:
-                            value_str = line.split(':')[1].strip().replace(' A', '')
-                            current_value = float(value_str)
-                            print(f"Parsed current: {current_value}")
-                            break
-                        except (ValueError, IndexError):
-                            print(f"Failed to parse current from: '{line}'")
-
-                # Store data - ensure all arrays have same length
-                self.voltages_data.append(voltage_value)
-                self.current_data.append(current_value)
-                self.time_data.append(time.time())
-                self.readings_data.append(i + 1)
-
-                # Debug: Print array lengths to ensure they stay synchronized
-                print(
-                    f"Data lengths - V:{len(self.voltages_data)}, I:{len(self.current_data)}, T:{len(self.time_data)}, R:{len(self.readings_data)}")
-
-            self.arduino.close()
-            # Schedule graph creation in main thread
-            self.after(0, self.create_graph_display)
-            self.after(10, self.plot_results)
-            self.status_label.configure(text="Status: Experiment Complete!", text_color="lime")
-            self.show_data_button.configure(state="normal")  # Enable button after run
+            self.apply_events()
+        except Exception:
+            # A failed redraw must not stop the pump, or no sample, status or done event reaches the UI again
+            log.exception("Applying worker events failed")
+        finally:
+            self.after(UI_TICK_MS, self.process_events)
+
+    def apply_events(self):
+        if self.process_run is not None:
+            self.pump_acquisition_process()
+        batch = coalesce(self.events.drain())
+
+        for store, samples in batch.samples.items():
+            start = time.perf_counter_ns()
+            store.extend(samples)
+            METRICS.observe(STORE_APPEND, time.perf_counter_ns() - start)
+        if batch.samples:
+            self._plot_dirty = True
+
+        if batch.status:
+            for source, (kind, payload) in batch.status.items():
+                if kind == PROGRESS:
+                    self.status_lines[source] = (progress_text(*payload), "green")
+                else:
+                    self.status_lines[source] = payload
+            self.render_status()
+
+        if batch.alarms:
+            for store, alarm in batch.alarms:
+                alarms = self.alarms.setdefault(store, collections.deque(maxlen=MAX_ALARM_MARKERS))
+                alarms.append(alarm)
+            store, alarm = batch.alarms[-1]
+            device = next((port for port, device_store in self.device_stores.items() if device_store is store), None)
+            text = alarm_text(alarm)
+            self.alarm_label.configure(text=f"{device}: {text}" if device else text)
+            self._plot_dirty = True
+
+        if batch.ports is not None:
+            self.on_ports_found(batch.ports)
+
+        for key, result in batch.analyses:
+            self.on_analysis_done(key, result)
+
+        try:
+            if self._plot_dirty:
+                self.refresh_live_plot()
+        finally:
+            # Drained done events are not delivered again, re-enable the controls even if the redraw failed
+            for source, succeeded in batch.done:
+                self.on_experiment_done(succeeded)
+
+    def render_status(self):
+        """Show the newest status, one line per device in multi-device mode"""
+        if None in self.status_lines or not self.status_lines:
+            text, color = self.status_lines.get(None, ("Status: Idle", "gray"))
+        else:
+            text = "\n".join(f"{port}: {line.replace('Status: ', '')}"
+                              for port, (line, _) in self.status_lines.items())
+            color = list(self.status_lines.values())[-1][1]
+        self.status_label.configure(text=text, text_color=color)
 
+    def run_experiment(self, connection, readings, stabilize_time, detectors=None):
+        succeeded = False
+        try:
+            self.post_status("Status: Connecting...", "yellow")
+            connection.arm()  # opens the port on the first run only, later runs start at once
+            journal = JournalWriter(new_journal_path(SESSIONS_DIR),
+                                    metadata={"port": connection.port, "baudrate": connection.baudrate})
+            engine = connection.engine(readings=readings, stabilize_time=stabilize_time,
+                                       on_sample=self.on_sample, on_status=self.post_status,
+                                       on_progress=self.post_progress, sinks=[journal],
+                                       detectors=detectors, on_alarm=self.on_alarm)
+            self.active_run = engine
+            if self._stop_requested:  # Stop was pressed while the port was opening
+                engine.stop()
+            engine.run()
+            log.info("Session saved to %s", journal.path)
+            self.post_status("Status: Experiment Complete!", "lime")
+            succeeded = True
+
+        except JournalError as e:
+            # The readings are all in the store and can still be exported, only the journal is incomplete
+            self.post_status(f"Error: {e}", "red")
+            succeeded = True
         except (ValueError, TypeError) as e:
-            self.status_label.configure(text=f"Error: Invalid input. {e}", text_color="red")
+            self.post_status(f"Error: Invalid input. {e}", "red")
         except serial.SerialException as e:
-            self.status_label.configure(text=f"Error: Serial connection failed.", text_color="red")
+            self.post_status(f"Error: Serial connection failed.", "red")
         except Exception as e:
-            self.status_label.configure(text=f"Error: {str(e)}", text_color="red")
+            log.exception("Experiment failed")
+            self.post_status(f"Error: {str(e)}", "red")
         finally:
-            self.is_monitoring = False
-            self.start_button.configure(state="normal", text="Start Experiment")
-            print("Experiment thread completed")
+            self.events.publish(DONE, None, succeeded)
+            log.info("Experiment thread completed")
+
+    def run_multi_experiment(self, acquisition):
+        """Acquire from several devices concurrently; each device fills its own store"""
+        try:
+            acquisition.run()
+        finally:
+            succeeded = any(channel.count for channel in acquisition.channels)
+            self.events.publish(DONE, None, succeeded)
+            log.info("Multi-device experiment thread completed")
+
+    def on_experiment_done(self, succeeded):
+        """Worker finished: final redraw and re-enable controls - MUST be called from main thread"""
+        if succeeded:
+            # Final full redraw with tight limits
+            self.plot_results()
+            self.show_data_button.configure(state="normal")  # Enable button after run
+            self.export_button.configure(state="normal")
+        self.finish_experiment()
+
+    def finish_experiment(self):
+        """Re-enable controls once the worker is done - MUST be called from main thread"""
+        self.is_monitoring = False
+        self.active_run = None
+        self.start_button.configure(state="normal", text="Start Experiment")
+        self.stop_button.configure(state="disabled")
+        if self.session is not None:
+            self.replay_button.configure(state="normal")
 
     def clear_graph_area(self):
         """Clear the graph area and show placeholder - MUST be called from main thread"""
         try:
+            if hasattr(self, 'live_plot'):
+                self.live_plot.disconnect()
+                del self.live_plot
+
             # Remove existing canvas if it exists
             if hasattr(self, 'canvas'):
                 self.canvas.get_tk_widget().destroy()
@@ -301,8 +970,12 @@ class MonitoringApp(ctk.CTk):
             if hasattr(self, 'ax1'):
                 del self.ax1
 
+            if hasattr(self, 'ax_spectrum'):
+                del self.ax_spectrum
+
             # Close any remaining matplotlib figures
-            plt.close('all')
+            if plt is not None:
+                plt.close('all')
 
             # Recreate placeholder
             if not hasattr(self, 'plot_placeholder') or not self.plot_placeholder.winfo_exists():
@@ -314,12 +987,52 @@ class MonitoringApp(ctk.CTk):
                 )
                 self.plot_placeholder.pack(expand=True, fill="both", padx=20, pady=20)
 
-            print("Graph area cleared successfully")
+            log.debug("Graph area cleared successfully")
         except Exception as e:
-            print(f"Error clearing graph area: {e}")
+            log.error("Error clearing graph area: %s", e)
+
+    def start_live_plot(self):
+        """Create the graph when the experiment starts and keep it updated while data arrives"""
+        self.create_graph_display()
+        if not hasattr(self, 'live_plot'):
+            return
+        x_axis = self.x_axis_menu.get()
+        y_axis = self.y_axis_menu.get()
+        self.ax1.set_xlabel(self.get_axis_label(x_axis))
+        self.ax1.set_ylabel(self.get_axis_label(y_axis))
+        self.ax1.set_title(f"{y_axis} vs {x_axis}", color="white")
+        self.canvas.draw()
+
+    def refresh_live_plot(self):
+        """Blit newly acquired samples onto the graph - MUST be called from main thread"""
+        if not hasattr(self, 'live_plot'):
+            self._plot_dirty = False
+            return
+        x_axis = self.x_axis_menu.get()
+        y_axis = self.y_axis_menu.get()
+        x_data = self.get_data_for_axis(x_axis)
+        y_data = self.get_data_for_axis(y_axis)
+        if len(x_data) and len(y_data):
+            self.update_alarm_markers(x_data, y_data)
+            start = time.perf_counter_ns()
+            render = self.get_render_series(x_axis, y_axis)
+            if render is None:
+                drawn = self.live_plot.update(x_data, y_data)
+            elif render[2] is None:
+                drawn = self.live_plot.update(render[0], render[1])
+            else:
+                drawn = self.live_plot.show_window(*render)
+            if drawn:
+                METRICS.observe(PLOT_RENDER, time.perf_counter_ns() - start)
+                self._plot_dirty = False  # otherwise retried on the next tick
+        if hasattr(self, 'ax_spectrum') and time.perf_counter() - self._spectrum_drawn >= SPECTRUM_REFRESH_S:
+            self.draw_spectrum()
+            self.canvas.draw_idle()
 
     def create_graph_display(self):
-        """Create the matplotlib graph after experiment completion"""
+        """Create the matplotlib graph and its persistent live line"""
+        load_matplotlib()
+
         # Remove placeholder if it exists
         if hasattr(self, 'plot_placeholder'):
             self.plot_placeholder.destroy()
@@ -344,13 +1057,24 @@ class MonitoringApp(ctk.CTk):
 
         # Create matplotlib figure and canvas in main thread
         try:
-            self.fig, self.ax1 = plt.subplots(figsize=(6, 4), dpi=100)
+            if self.spectrum_menu.get() == "Off":
+                self.fig, self.ax1 = plt.subplots(figsize=(6, 4), dpi=100)
+            else:
+                self.fig, (self.ax1, self.ax_spectrum) = plt.subplots(1, 2, figsize=(9, 4), dpi=100,
+                                                                      gridspec_kw={"width_ratios": [3, 2]})
             self.style_plot()
             self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_frame)
             self.canvas.get_tk_widget().pack(side=ctk.BOTTOM, fill=ctk.BOTH, expand=True, padx=10, pady=10)
-            print("Graph display created successfully")
+            self.ax1.grid(True, which='both', linestyle='--', color='gray', alpha=0.5)
+            self.live_plot = LivePlot(self.canvas, self.ax1, max_fps=LIVE_PLOT_MAX_FPS,
+                                      color='cyan', linestyle='-', linewidth=2,
+                                      marker='o', markersize=6, markerfacecolor='white',
+                                      markeredgecolor='cyan', markeredgewidth=2)
+            self.alarm_markers = self.live_plot.add_overlay(linestyle='none', marker='X', markersize=11,
+                                                            color='orange', markeredgecolor='red', zorder=5)
+            log.debug("Graph display created successfully")
         except Exception as e:
-            print(f"Error creating graph display: {e}")
+            log.exception("Error creating graph display")
             # Fallback: show error message
             error_label = ctk.CTkLabel(
                 self.graph_frame,
@@ -362,85 +1086,199 @@ class MonitoringApp(ctk.CTk):
 
     def plot_results(self):
         """Plot results based on selected axes"""
-        if not hasattr(self, 'ax1'):
+        if not hasattr(self, 'ax1') or not hasattr(self, 'live_plot'):
             return
 
-        self.ax1.clear()
+        # Reuse the persistent line instead of clearing and rebuilding the axes
+        self.live_plot.reset()
 
         # Get selected axes
         x_axis = self.x_axis_menu.get()
         y_axis = self.y_axis_menu.get()
 
-        # Get data based on selection
-        x_data = self.get_data_for_axis(x_axis)
-        y_data = self.get_data_for_axis(y_axis)
-
         # Check if we have data
-        if not x_data or not y_data or len(x_data) == 0 or len(y_data) == 0:
+        if len(self.store) == 0:
             self.ax1.set_title("Experiment Results (No data available)", color="red")
             self.ax1.set_xlabel(self.get_axis_label(x_axis))
             self.ax1.set_ylabel(self.get_axis_label(y_axis))
             self.canvas.draw()
             return
 
-        # Ensure both arrays are same length
-        min_length = min(len(x_data), len(y_data))
-        x_data = x_data[:min_length]
-        y_data = y_data[:min_length]
-
-        # Filter out NaN values but keep indices aligned
-        valid_x = []
-        valid_y = []
-        for i in range(len(x_data)):
-            if not (np.isnan(x_data[i]) or np.isnan(y_data[i])):
-                valid_x.append(x_data[i])
-                valid_y.append(y_data[i])
+        # NaN-filtered series and limits, cached until new samples arrive
+        valid_x, valid_y, x_limits, y_limits = self.get_plot_series(x_axis, y_axis)
 
-        if not valid_x:
+        if len(valid_x) == 0:
             self.ax1.set_title("Experiment Results (No valid data received)", color="red")
             self.ax1.set_xlabel(self.get_axis_label(x_axis))
             self.ax1.set_ylabel(self.get_axis_label(y_axis))
             self.canvas.draw()
             return
 
-        # Plot with connected line and markers
-        self.ax1.plot(valid_x, valid_y, color='cyan', linestyle='-', linewidth=2,
-                      marker='o', markersize=6, markerfacecolor='white',
-                      markeredgecolor='cyan', markeredgewidth=2)
+        # Plot with connected line and markers; long runs and time windows go through the decimation pyramid
+        render = self.get_render_series(x_axis, y_axis)
+        if render is None:
+            self.live_plot.line.set_data(valid_x, valid_y)
+        else:
+            render_x, render_y, window_limits = render
+            self.live_plot.line.set_data(render_x, render_y)
+            if window_limits is not None:
+                x_limits = window_limits
+            if len(render_y):
+                # Every bucket's min and max is drawn, a session's strided column may have skipped the peaks
+                y_limits = padded_limits(render_y)
+        self.update_alarm_markers(self.get_data_for_axis(x_axis), self.get_data_for_axis(y_axis))
 
         # Set labels and title
         self.ax1.set_xlabel(self.get_axis_label(x_axis))
         self.ax1.set_ylabel(self.get_axis_label(y_axis))
-        self.ax1.set_title(f"{y_axis} vs {x_axis}")
-        self.ax1.grid(True, which='both', linestyle='--', color='gray', alpha=0.5)
+        self.ax1.set_title(f"{y_axis} vs {x_axis}", color="white")
 
         # Auto-scale the axes for better visualization
-        if valid_x and valid_y:
-            x_margin = (max(valid_x) - min(valid_x)) * 0.05 if max(valid_x) != min(valid_x) else 0.1
-            y_margin = (max(valid_y) - min(valid_y)) * 0.05 if max(valid_y) != min(valid_y) else 0.1
-            self.ax1.set_xlim(min(valid_x) - x_margin, max(valid_x) + x_margin)
-            self.ax1.set_ylim(min(valid_y) - y_margin, max(valid_y) + y_margin)
+        self.ax1.set_xlim(*x_limits)
+        self.ax1.set_ylim(*y_limits)
+
+        if hasattr(self, 'ax_spectrum'):
+            self.draw_spectrum()
 
         # Force canvas update
+        start = time.perf_counter_ns()
         self.canvas.draw()
+        METRICS.observe(PLOT_RENDER, time.perf_counter_ns() - start)
         self.canvas.flush_events()
         self.update_idletasks()
 
+    def draw_spectrum(self):
+        """Fold new samples into the Welch estimate and redraw the spectrum panel (no canvas draw)"""
+        field = AXIS_FIELDS.get(self.y_axis_menu.get())
+        field = field if field in SPECTRUM_SIGNALS else "voltage"
+        if self.spectral.field != field:
+            self.spectral = SpectralAnalyzer(field, segment=SPECTRUM_SEGMENT)
+        store = self.store
+        building = isinstance(store, SessionView) and self.spectral.backlog(store) > BACKGROUND_ROWS
+        if building:
+            def build():
+                analyzer = SpectralAnalyzer(field, segment=SPECTRUM_SEGMENT)
+                analyzer.update(store)
+                return analyzer
+            self.start_analysis(("spectrum", store, field), build)
+        else:
+            self.spectral.update(store)
+        self._spectrum_drawn = time.perf_counter()
+
+        ax = self.ax_spectrum
+        ax.clear()
+        self.style_axes(ax)
+        ax.set_xlabel("Frequency (Hz)")
+        if building:
+            ax.set_title(f"{field.capitalize()} spectrum (computing...)", color="gray")
+            return
+        spectrum = self.spectral.spectrum()
+        if spectrum is None:
+            ax.set_title(f"{field.capitalize()} spectrum (needs {SPECTRUM_SEGMENT} samples)", color="gray")
+            return
+        freqs, psd, report = spectrum
+        if self.spectrum_menu.get() == "Spectrogram":
+            _, rows = self.spectral.spectrogram()
+            ax.imshow(np.log10(rows.T + 1e-20), aspect="auto", origin="lower", cmap="viridis",
+                      extent=(0, len(rows), freqs[0], freqs[-1]))
+            ax.set_xlabel("Segment")
+            ax.set_ylabel("Frequency (Hz)")
+        else:
+            ax.semilogy(freqs[1:], psd[1:], color="orange")
+            harmonic_freqs = report.fundamental * np.arange(1, len(report.harmonics) + 1)
+            ax.semilogy(harmonic_freqs, report.harmonics ** 2, linestyle="none", marker="v", color="red")
+            ax.set_ylabel("PSD")
+        thd = f", THD {report.thd * 100:.1f}%" if report.thd is not None else ""
+        ax.set_title(f"{field.capitalize()}: {report.fundamental:.3g} Hz{thd}", color="white")
+
+    def update_alarm_markers(self, x_data, y_data):
+        """Place a marker on the graph at every recent alarm of the shown store"""
+        if not hasattr(self, 'alarm_markers'):
+            return
+        alarms = self.alarms.get(self.store, ())
+        # Each store row is one reading, numbered from 1
+        rows = np.fromiter((alarm.reading - 1 for alarm in alarms), dtype=np.int64, count=len(alarms))
+        rows = rows[rows < min(len(x_data), len(y_data))]
+        self.alarm_markers.set_data(np.asarray(x_data)[rows], np.asarray(y_data)[rows])
+
+    def get_render_series(self, x_axis, y_axis):
+        """(x, y, x_limits) to draw for the selected view window, min/max-decimated to the graph's width.
+
+        x_limits is None for the whole run. Returns None when the columns should be drawn
+        as they are: the X axis is not monotonic, or a long session's pyramid is still
+        being built on a worker thread.
+        """
+        x_field, y_field = AXIS_FIELDS.get(x_axis), AXIS_FIELDS.get(y_axis)
+        store = self.store
+        if x_field not in MONOTONIC_FIELDS or y_field is None or len(store) == 0:
+            return None
+        if self._pyramid_key != (store, y_field):
+            self.pyramid = MinMaxPyramid()
+            self._pyramid_key = (store, y_field)
+        if isinstance(store, SessionView) and len(store) - self.pyramid.rows > BACKGROUND_ROWS:
+            # Draw the strided columns until the worker delivers the pyramid
+            values = store.view()[y_field]
+            def build():
+                pyramid = MinMaxPyramid()
+                pyramid.update(values)
+                return pyramid
+            self.start_analysis(("pyramid", store, y_field), build)
+            return None
+        # Two points (min and max) per pixel column is enough to show every peak
+        max_points = 2 * max(int(self.ax1.bbox.width), 100)
+        return render_series(store, x_field, y_field, self.pyramid, VIEW_WINDOWS.get(self.view_menu.get()),
+                             max_points)
+
+    def start_analysis(self, key, build):
+        """Run build() on a worker thread; its result comes back as an ANALYSIS event with key"""
+        if key in self._analyses_running:
+            return
+        self._analyses_running.add(key)
+
+        def work():
+            try:
+                result = build()
+            except Exception:
+                log.exception("Background %s analysis failed", key[0])
+                result = None
+            self.events.publish(ANALYSIS, key, result)
+
+        threading.Thread(target=work, name=f"{key[0]}-analysis", daemon=True).start()
+
+    def on_analysis_done(self, key, result):
+        """Install a pyramid or spectrum built in the background if it still matches the view - main thread"""
+        self._analyses_running.discard(key)
+        kind, store, field = key
+        if result is None or store is not self.store:
+            return
+        if kind == "pyramid" and self._pyramid_key == (store, field):
+            self.pyramid = result
+        elif kind == "spectrum" and self.spectral.field == field:
+            self.spectral = result
+        else:
+            return
+        if not self.is_monitoring:
+            self.plot_results()
+
+    def get_plot_series(self, x_axis, y_axis):
+        """Return (valid_x, valid_y, x_limits, y_limits) for an axis pair, cached per store version"""
+        if self._series_cache_key != (self.store, self.store.version):
+            # New samples (or a new store) invalidate every prepared pair
+            self._series_cache = {}
+            self._series_cache_key = (self.store, self.store.version)
+        series = self._series_cache.get((x_axis, y_axis))
+        if series is None:
+            series = prepare_series(self.get_data_for_axis(x_axis), self.get_data_for_axis(y_axis))
+            self._series_cache[(x_axis, y_axis)] = series
+        return series
+
     def get_data_for_axis(self, axis_name):
-        """Return data array for the specified axis"""
-        if axis_name == "Voltage":
-            return self.voltages_data.copy()
-        elif axis_name == "Current":
-            return self.current_data.copy()
-        elif axis_name == "Time":
-            # Convert to relative time (seconds from start)
-            if self.time_data and len(self.time_data) > 0:
-                start_time = self.time_data[0]
-                return [(t - start_time) for t in self.time_data]
-            return []
-        elif axis_name == "Reading Number":
-            return self.readings_data.copy()
-        return []
+        """Return data array for the specified axis (a zero-copy view where possible)"""
+        field = AXIS_FIELDS.get(axis_name)
+        if field is None or field not in self.store.dtype.names:
+            return np.empty(0)
+        # Time is the relative time (seconds from start), computed once by the engine
+        return self.store.column(field)
 
     def get_axis_label(self, axis_name):
         """Return proper label for axis"""
@@ -448,49 +1286,77 @@ class MonitoringApp(ctk.CTk):
             "Voltage": "Voltage (V)",
             "Current": "Current (A)",
             "Time": "Time (s)",
-            "Reading Number": "Reading Number"
+            "Reading Number": "Reading Number",
+            "Power": "Power (W)",
+            "Energy": "Energy (J)",
+            "Power (Rolling Mean)": "Rolling Mean Power (W)",
+            "Power (Rolling Std)": "Rolling Std of Power (W)",
+            "Power (Rolling Min)": "Rolling Min Power (W)",
+            "Power (Rolling Max)": "Rolling Max Power (W)",
         }
         return labels.get(axis_name, axis_name)
 
     # --- NEW FEATURE: Function to show data in a new window ---
     def show_data_window(self):
-        if not self.voltages_data: return
-
-        # Create a new "Toplevel" window
-        data_window = ctk.CTkToplevel(self)
-        data_window.title("Collected Data")
-        data_window.geometry("500x400")
-
-        # Create a textbox to display the data
-        textbox = ctk.CTkTextbox(data_window, width=500, height=400, font=("Courier", 12))
-        textbox.pack(expand=True, fill="both")
-
-        # Format and insert the data
-        header = "Reading | Voltage (V) | Current (A) | Time (s)\n"
-        header += "--------|-------------|-------------|----------\n"
-        textbox.insert("0.0", header)
-
-        start_time = self.time_data[0] if self.time_data else 0
-        for i in range(len(self.voltages_data)):
-            voltage = self.voltages_data[i] if i < len(self.voltages_data) else 0
-            current = self.current_data[i] if i < len(self.current_data) else 0
-            time_val = (self.time_data[i] - start_time) if i < len(self.time_data) else 0
-            line = f"{i + 1:<8}| {voltage:<11.4f} | {current:<11.4f} | {time_val:<8.2f}\n"
-            textbox.insert(ctk.END, line)
-
-        textbox.configure(state="disabled")  # Make it read-only
+        if not len(self.store): return
+        # Virtualized table: only the visible page of rows is ever formatted
+        DataTableWindow(self, self.store,
+                        title=f"Collected Data ({self.store.bytes_per_sample:.0f} bytes/sample)")
+
+    def export_data(self):
+        """Write the shown samples to CSV, NPZ or Parquet in the background"""
+        if not len(self.store):
+            return
+        path = filedialog.asksaveasfilename(parent=self, title="Export Data", defaultextension=".csv",
+                                            initialfile="samples.csv",
+                                            filetypes=[(name, f"*{ext}") for ext, name in EXPORT_FORMATS.items()])
+        if not path:
+            return
+        try:
+            # A snapshot of the rows present now; a session view exports its full-resolution range
+            ExportWindow(self, self.store.view(), path)
+        except ExportError as e:
+            self.status_label.configure(text=f"Error: {e}", text_color="red")
+
+    def show_diagnostics(self):
+        """Open the timing counters panel (or raise it if already open)"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self, METRICS)
 
     # --- Helper Functions (same as before) ---
-    def get_available_ports(self):
-        ports = serial.tools.list_ports.comports()
-        return [port.device for port in ports] if ports else ["No ports found"]
-
     def update_com_ports(self):
-        available_ports = self.get_available_ports()
-        self.com_port_menu.configure(values=available_ports)
-        if available_ports: self.com_port_menu.set(available_ports[0])
+        """Rescan the serial ports in the background so the window never waits on the OS"""
+        if self._port_scan_running:
+            return
+        self._port_scan_running = True
+        self.refresh_button.configure(state="disabled", text="Searching...")
+        threading.Thread(target=self.scan_ports, name="port-scan", daemon=True).start()
+
+    def on_ports_found(self, available_ports):
+        """Fill the port menu with the scan result - MUST be called from main thread"""
+        self._port_scan_running = False
+        self.available_ports = available_ports
+        self.refresh_button.configure(state="normal", text="Refresh Ports")
+        current = self.com_port_menu.get()
+        self.com_port_menu.configure(values=available_ports, state="normal")
+        if current not in available_ports and available_ports:
+            self.com_port_menu.set(available_ports[0])
+
+    def style_axes(self, ax):
+        """Dark theme for a secondary axes"""
+        ax.set_facecolor('#2B2B2B')
+        ax.tick_params(colors='white')
+        for spine in ax.spines.values():
+            spine.set_color('gray')
+        ax.title.set_color('white')
+        ax.xaxis.label.set_color('white')
+        ax.yaxis.label.set_color('white')
 
     def style_plot(self):
+        if hasattr(self, 'ax_spectrum'):
+            self.style_axes(self.ax_spectrum)
         self.fig.patch.set_facecolor('#2B2B2B')
         self.ax1.set_facecolor('#2B2B2B')
         self.ax1.tick_params(axis='x', colors='white')
@@ -506,5 +1372,6 @@ class MonitoringApp(ctk.CTk):
 
 # --- Main entry point ---
 if __name__ == "__main__":
+    configure_logging(os.environ.get("VI_DAQ_LOG_LEVEL", "WARNING"))
     app = MonitoringApp()
     app.mainloop()
@@ -0,0 +1,367 @@
+"""Headless acquisition engine for the V/I Data Acquisition Unit.
+
+The engine talks to an Arduino running Dc_Voltage_Current_Measurement.ino
+through a pluggable transport (a ``serial.Serial`` port, a pyserial URL such
+as ``loop://``, or a pty path) and hands every reading to its callbacks and
+sinks. It has no Tk dependency, so the GUI uses it from a worker thread and
+it can also run unattended without a display:
+
+    python -m acquisition --port COM3 --readings 100 --output run.csv
+"""
+import argparse
+import collections
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import serial
+
+from analytics import StreamingAnalytics
+from anomaly import DEFAULT_SETTINGS, AnomalyMonitor, alarm_text
+from diagnostics import ALARMS, METRICS, PARSE, SAMPLES, SERIAL_WAIT, configure_logging
+from export import csv_formats
+from frame_parser import FrameParser
+from session_journal import JOURNAL_EXTENSION, JournalError, JournalWriter
+
+log = logging.getLogger(__name__)
+
+# One parsed reading from the Arduino, fields match sample_store.SAMPLE_DTYPE
+Sample = collections.namedtuple("Sample", ["reading", "time_ns", "elapsed", "voltage", "current",
+                                           "power", "energy", "power_mean", "power_std", "power_min",
+                                           "power_max"])
+
+
+class AcquisitionError(Exception):
+    """Raised when the device does not follow the expected protocol"""
+
+
+def progress_text(count, total):
+    """Status bar text for an on_progress callback"""
+    return f"Status: Taking reading {count}/{total if total is not None else '?'}..."
+
+
+def open_transport(port, baudrate=9600, timeout=2):
+    """Open a serial port, pty path or pyserial URL (e.g. loop://) as a transport"""
+    return serial.serial_for_url(port, baudrate=baudrate, timeout=timeout)
+
+
+class CsvSampleWriter:
+    """Sink that streams samples to a CSV file, flushing in batches"""
+
+    def __init__(self, path, flush_every=50):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(Sample._fields)
+        self.flush_every = flush_every
+        self._pending = 0
+
+    def write(self, sample):
+        self.writer.writerow(sample)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.file.flush()
+            self._pending = 0
+
+    def close(self):
+        self.file.close()
+
+
+class AcquisitionEngine:
+    """Reads V/I samples from a transport until the reading count is reached or stop() is called"""
+
+    def __init__(self, transport, readings=None, stabilize_time=0.0, settle_time=2.0,
+                 on_sample=None, on_status=None, on_progress=None, sinks=(), close_transport=True,
+                 banner_timeout=10.0, analytics_window=60, detectors=None, on_alarm=None,
+                 calibration_offset=None):
+        self.transport = transport
+        self.readings = readings  # None means run until stopped
+        self.stabilize_time = stabilize_time
+        self.settle_time = settle_time
+        self.on_sample = on_sample
+        self.on_status = on_status  # phase changes: on_status(text, color)
+        self.on_progress = on_progress  # every reading: on_progress(count, total or None)
+        self.sinks = list(sinks)
+        self.close_transport = close_transport
+        self.banner_timeout = banner_timeout
+        self.parser = FrameParser()
+        # A known offset (connection.ConnectionManager keeps the port open) skips the reset and banner wait
+        self.parser.calibration_offset = calibration_offset
+        self.analytics = StreamingAnalytics(analytics_window)  # derived quantities, O(1) per sample
+        self.detectors = detectors  # optional anomaly.AnomalyMonitor, fed every sample
+        self.on_alarm = on_alarm  # on_alarm(alarm) for each alarm the detectors raise
+        self._backlog = []  # frames parsed along with the banner, before the reading loop started
+        self.start_ns = None  # timestamp of the first reading
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ask the engine to finish after the current reading"""
+        self._stop.set()
+        interrupt = getattr(self.transport, "interrupt", None)
+        if interrupt is not None:
+            interrupt()  # e.g. a ConnectionManager waiting to reconnect
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _status(self, text, color):
+        if self.on_status:
+            self.on_status(text, color)
+
+    def _read_chunk(self):
+        """Read every byte already waiting, blocking up to the port timeout for at least one"""
+        start = time.perf_counter_ns()
+        data = self.transport.read(self.transport.in_waiting or 1)
+        METRICS.observe(SERIAL_WAIT, time.perf_counter_ns() - start)
+        return data
+
+    def _parse(self, data):
+        start = time.perf_counter_ns()
+        frames = self.parser.feed(data)
+        METRICS.observe(PARSE, time.perf_counter_ns() - start)
+        return frames
+
+    def run(self):
+        """Run the experiment on the calling thread, returning the number of readings.
+
+        Sinks and the transport are closed on the way out. A sink that fails to
+        close (e.g. a JournalError after a full disk) is raised once all are closed,
+        unless the run itself already failed.
+        """
+        try:
+            count = self._acquire()
+        except BaseException:
+            self._close(raise_errors=False)
+            raise
+        self._close()
+        return count
+
+    def _acquire(self):
+        if self.parser.calibration_offset is None:
+            self._status("Status: Connecting...", "yellow")
+            # Opening the port resets the Arduino, give it time to boot
+            self._stop.wait(self.settle_time)
+
+            # Discard anything buffered before the reset, then wait for the banner
+            self.transport.reset_input_buffer()
+            self.wait_for_calibration()
+        else:
+            # Re-armed on an open port: drop what queued up since the last run, start on the next frame
+            self.transport.reset_input_buffer()
+            self.parser.resync()
+
+        self._status(f"Status: Stabilizing for {self.stabilize_time}s...", "cyan")
+        if self.stabilize_time > 0:
+            if self._stop.wait(self.stabilize_time):
+                return 0
+            # Readings taken while the machine was stabilizing are not wanted; the flush usually cuts a
+            # frame in half, so start on the next frame rather than count its tail as malformed
+            self.transport.reset_input_buffer()
+            self.parser.resync()
+            self._backlog = []
+
+        count = 0
+        while not self._stop.is_set() and (self.readings is None or count < self.readings):
+            frames, self._backlog = self._backlog or self._parse(self._read_chunk()), []
+            for voltage, current in frames:
+                count += 1
+                if self.on_progress:
+                    self.on_progress(count, self.readings)
+                self._emit(self._make_sample(count, voltage, current))
+                if self.readings is not None and count >= self.readings:
+                    break
+        log.info("Acquired %d readings, %d malformed frames", count, self.parser.malformed)
+        return count
+
+    def _close(self, raise_errors=True):
+        """Close every sink and the transport, then raise the first sink error"""
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                if not raise_errors:
+                    log.error("Closing %s failed: %s", type(sink).__name__, e)
+                error = error or e
+        if self.close_transport:
+            self.transport.close()
+        if error is not None and raise_errors:
+            raise error
+
+    def wait_for_calibration(self):
+        """Consume startup messages until the calibration line is parsed, returning the offset in mV"""
+        deadline = time.monotonic() + self.banner_timeout
+        while self.parser.calibration_offset is None and not self._stop.is_set():
+            if time.monotonic() > deadline:
+                raise AcquisitionError(f"No calibration banner from the Arduino within {self.banner_timeout}s")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Waiting for calibration banner, parser state %s", self.parser.state)
+            # Frames that arrive in the same chunk as the banner are kept for the reading loop
+            self._backlog = self._parse(self._read_chunk())
+        log.info("Calibrated current sensor offset: %s mV", self.parser.calibration_offset)
+        return self.parser.calibration_offset
+
+    def _make_sample(self, reading, voltage, current):
+        now = time.time_ns()
+        if self.start_ns is None:
+            self.start_ns = now
+        derived = self.analytics.update(now, voltage, current)
+        return Sample(reading, now, (now - self.start_ns) / 1e9, voltage, current, *derived)
+
+    def _emit(self, sample):
+        METRICS.count(SAMPLES)
+        for sink in self.sinks:
+            sink.write(sample)
+        if self.on_sample:
+            self.on_sample(sample)
+        if self.detectors is not None:
+            for alarm in self.detectors.update(sample):
+                METRICS.count(ALARMS)
+                log.info("%s %s alarm at reading %d: value %.4f, score %.2f",
+                         alarm.signal, alarm.detector, alarm.reading, alarm.value, alarm.score)
+                if self.on_alarm:
+                    self.on_alarm(alarm)
+
+
+# --- Command line entry point ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless V/I data acquisition")
+    parser.add_argument("--port", required=True, action="append",
+                        help="Serial port, pty path or pyserial URL (e.g. loop://). "
+                             "Repeat to acquire from several devices at once")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--readings", type=int, default=None, help="Number of readings (default: run until Ctrl+C)")
+    parser.add_argument("--stabilize", type=float, default=0.0, help="Stabilization time in seconds")
+    parser.add_argument("--settle", type=float, default=2.0, help="Wait after opening the port for the Arduino reset")
+    parser.add_argument("--output", help="CSV file to stream samples to (one file per device when several ports are given)")
+    parser.add_argument("--log-level", default="WARNING", help="DEBUG, INFO, WARNING or ERROR")
+    parser.add_argument("--log-json", action="store_true", help="Write log records as JSON lines")
+    parser.add_argument("--metrics-json", help="Write timing counters to this JSON file when the run ends")
+    parser.add_argument("--journal", help="Crash-safe session journal (.vij) to stream samples to "
+                                          "(one per device when several ports are given)")
+    parser.add_argument("--detect", action="store_true",
+                        help="Run the EWMA, CUSUM and z-score anomaly detectors and report alarms")
+    parser.add_argument("--ewma-threshold", type=float, default=DEFAULT_SETTINGS["ewma_threshold"],
+                        help="EWMA alarm threshold in standard deviations")
+    parser.add_argument("--cusum-threshold", type=float, default=DEFAULT_SETTINGS["cusum_threshold"],
+                        help="CUSUM alarm threshold on the cumulative sum")
+    parser.add_argument("--z-threshold", type=float, default=DEFAULT_SETTINGS["zscore_threshold"],
+                        help="Rolling z-score alarm threshold")
+    args = parser.parse_args(argv)
+
+    if args.readings is not None and args.readings <= 0:
+        parser.error("--readings must be positive")
+    configure_logging(args.log_level, structured=args.log_json)
+    try:
+        if len(args.port) > 1:
+            return run_multi_device(args)
+        return run_single_device(args)
+    finally:
+        if args.metrics_json:
+            METRICS.to_json(args.metrics_json)
+
+
+def detector_settings(args):
+    """AnomalyMonitor settings from the command line thresholds"""
+    return {"ewma_threshold": args.ewma_threshold, "cusum_threshold": args.cusum_threshold,
+            "zscore_threshold": args.z_threshold}
+
+
+def run_single_device(args):
+    """Acquire from the single --port on the calling thread"""
+    from connection import ConnectionManager
+
+    sinks = [CsvSampleWriter(args.output)] if args.output else []
+    if args.journal:
+        sinks.append(JournalWriter(args.journal, metadata={"port": args.port[0], "baudrate": args.baudrate}))
+    # The connection reopens the port with backoff if the device drops out during the run
+    connection = ConnectionManager(args.port[0], baudrate=args.baudrate, settle_time=args.settle)
+    try:
+        connection.arm()
+    except serial.SerialException as e:
+        print(f"Error: Serial connection failed. {e}", file=sys.stderr)
+        return 1
+
+    engine = connection.engine(readings=args.readings, stabilize_time=args.stabilize, sinks=sinks,
+                               on_status=lambda text, color: print(text, file=sys.stderr),
+                               detectors=AnomalyMonitor(detector_settings(args)) if args.detect else None,
+                               on_alarm=lambda alarm: print(f"ALARM: {alarm_text(alarm)}", file=sys.stderr))
+    try:
+        count = engine.run()
+    except KeyboardInterrupt:
+        print("Interrupted, stopping acquisition", file=sys.stderr)
+        return 130
+    except serial.SerialException as e:
+        print(f"Error: Serial connection failed. {e}", file=sys.stderr)
+        return 1
+    except AcquisitionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except JournalError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        connection.close()
+    print(f"Status: Experiment Complete! ({count} readings, {engine.parser.malformed} malformed frames)",
+          file=sys.stderr)
+    return 0
+
+
+def run_multi_device(args):
+    """Acquire from every --port concurrently, writing <output>_<port>.csv per device and <output>_merged.csv"""
+    from connection import ConnectionManager
+    from multi_device import MultiDeviceAcquisition
+
+    connections = {}
+
+    def sink_factory(channel):
+        sinks = []
+        if args.output:
+            root, ext = os.path.splitext(args.output)
+            sinks.append(CsvSampleWriter(f"{root}_{channel.name}{ext or '.csv'}"))
+        if args.journal:
+            root, ext = os.path.splitext(args.journal)
+            sinks.append(JournalWriter(f"{root}_{channel.name}{ext or JOURNAL_EXTENSION}",
+                                       metadata={"port": channel.port, "baudrate": args.baudrate}))
+        return sinks
+
+    acquisition = MultiDeviceAcquisition(
+        args.port, readings=args.readings, stabilize_time=args.stabilize, baudrate=args.baudrate,
+        settle_time=args.settle, sink_factory=sink_factory,
+        connection_factory=lambda channel: connections.setdefault(
+            channel.port, ConnectionManager(channel.port, baudrate=args.baudrate, settle_time=args.settle)),
+        on_status=lambda channel, text, color: print(f"[{channel.port}] {text}", file=sys.stderr),
+        detector_factory=(lambda channel: AnomalyMonitor(detector_settings(args))) if args.detect else None,
+        on_alarm=lambda channel, alarm: print(f"[{channel.port}] ALARM: {alarm_text(alarm)}", file=sys.stderr))
+    acquisition.start()
+    try:
+        count = acquisition.join()
+    except KeyboardInterrupt:
+        print("Interrupted, stopping acquisition", file=sys.stderr)
+        acquisition.stop()
+        acquisition.join()
+        return 130
+    finally:
+        for connection in connections.values():
+            connection.close()
+    failed = [channel for channel in acquisition.channels if channel.error]
+    if args.output:
+        # Cross-machine comparison: every device's samples on one shared timeline
+        root, ext = os.path.splitext(args.output)
+        merged = acquisition.merged_timeline()
+        np.savetxt(f"{root}_merged{ext or '.csv'}", merged, delimiter=",", comments="",
+                   header=",".join(merged.dtype.names), fmt=csv_formats(merged.dtype))
+    print(f"Status: Experiment Complete! ({count} readings from {len(acquisition.channels) - len(failed)}"
+          f"/{len(acquisition.channels)} devices)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # Run the imported module's main, not this __main__ copy: connection and multi_device import
+    # acquisition, and the errors they raise must be the classes the handlers above catch
+    import acquisition
+    sys.exit(acquisition.main())
@@ -0,0 +1,107 @@
+"""Streaming derived quantities: power, energy and rolling statistics.
+
+Every update is O(1) (amortized for the rolling min/max), so the cost per
+sample stays the same at the end of a day-long run as at the start. Nothing
+here looks back over the full history.
+"""
+import collections
+import math
+
+
+class RollingStats:
+    """Mean, variance, min and max of the last `window` values.
+
+    Mean and variance use Welford's update with a matching downdate for the
+    value leaving the window. Min and max come from monotonic deques.
+    """
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self._values = collections.deque()
+        self._mins = collections.deque()  # (index, value), values increasing
+        self._maxs = collections.deque()  # (index, value), values decreasing
+        self._index = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def update(self, value):
+        if len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        n = len(self._values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self._m2 += delta * (value - self.mean)
+
+        index = self._index
+        self._index += 1
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((index, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((index, value))
+        oldest = index - len(self._values) + 1
+        if self._mins[0][0] < oldest:
+            self._mins.popleft()
+        if self._maxs[0][0] < oldest:
+            self._maxs.popleft()
+
+    def _remove(self, value):
+        n = len(self._values) + 1  # count before the value was popped
+        if n == 1:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / (n - 1)
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def variance(self):
+        """Sample variance of the window (0 for fewer than two values)"""
+        n = len(self._values)
+        return self._m2 / (n - 1) if n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else math.nan
+
+    @property
+    def max(self):
+        return self._maxs[0][1] if self._maxs else math.nan
+
+
+class StreamingAnalytics:
+    """Per-sample power, trapezoidal energy and rolling power statistics"""
+
+    def __init__(self, window=60):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.energy = 0.0  # joules
+        self._last_time_ns = None
+        self._last_power = None
+        self.power = RollingStats(self.window)
+
+    def update(self, time_ns, voltage, current):
+        """Fold in one sample; returns (power, energy, power_mean, power_std, power_min, power_max)"""
+        power = voltage * current
+        if self._last_time_ns is not None:
+            dt = (time_ns - self._last_time_ns) / 1e9
+            self.energy += 0.5 * (power + self._last_power) * dt
+        self._last_time_ns = time_ns
+        self._last_power = power
+
+        self.power.update(power)
+        return power, self.energy, self.power.mean, self.power.std, self.power.min, self.power.max
@@ -0,0 +1,190 @@
+"""Online drift and anomaly detection on the V/I/P streams.
+
+Each detector folds in one value at a time in constant time and memory, so
+one lab PC can watch many machines continuously without re-running anything
+over the recorded history:
+
+* EwmaDetector - distance of a value from an exponentially weighted mean,
+  in units of the exponentially weighted standard deviation (sudden spikes).
+* CusumDetector - two-sided cumulative sum of standardized deviations from
+  a baseline learned at the start of the run (slow drift).
+* ZScoreDetector - z-score against a rolling window (outliers relative to
+  the recent past).
+
+AnomalyMonitor runs a set of detectors on the voltage, current and power of
+every sample and returns the alarms they raise.
+"""
+import collections
+import math
+
+from analytics import RollingStats
+
+# Signals of a Sample that are monitored
+SIGNALS = ("voltage", "current", "power")
+
+# Detector names, as reported in Alarm.detector
+EWMA = "ewma"
+CUSUM = "cusum"
+ZSCORE = "zscore"
+
+# Thresholds and tuning used when nothing else is configured
+DEFAULT_SETTINGS = {
+    "ewma_alpha": 0.1,  # weight of the newest value in the EWMA
+    "ewma_threshold": 5.0,  # alarm when |x - ewma| > threshold * ewm std
+    "cusum_slack": 0.5,  # allowed drift per sample, in baseline standard deviations
+    "cusum_threshold": 10.0,  # alarm when either cumulative sum exceeds this
+    "zscore_window": 60,  # samples in the rolling window
+    "zscore_threshold": 4.5,  # alarm when |z| exceeds this
+    "warmup": 50,  # samples each detector observes before it may raise alarms
+}
+
+# Smallest standard deviation used for scoring, keeps a perfectly flat signal from alarming on noise
+MIN_STD = 1e-6
+
+# One raised alarm, `score` is the detector statistic that crossed `threshold`
+Alarm = collections.namedtuple("Alarm", ["reading", "time_ns", "elapsed", "signal", "detector",
+                                         "value", "score", "threshold"])
+
+
+class EwmaDetector:
+    """Exponentially weighted mean and variance; scores each value against the estimate before it"""
+
+    def __init__(self, alpha=0.1, threshold=5.0, warmup=50):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.variance = 0.0
+
+    def update(self, value):
+        """Fold in one value; returns the score if it raises an alarm, else None"""
+        self.count += 1
+        if self.count == 1:
+            self.mean = value
+            return None
+        deviation = value - self.mean
+        score = abs(deviation) / max(math.sqrt(self.variance), MIN_STD)
+        # West's incremental EWMA variance
+        increment = self.alpha * deviation
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + deviation * increment)
+        if self.count > self.warmup and score > self.threshold:
+            return score
+        return None
+
+
+class CusumDetector:
+    """Two-sided CUSUM of standardized deviations from a baseline learned over the warmup"""
+
+    def __init__(self, slack=0.5, threshold=10.0, warmup=50):
+        self.slack = slack
+        self.threshold = threshold
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.target = 0.0
+        self._m2 = 0.0
+        self.high = 0.0
+        self.low = 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def update(self, value):
+        """Fold in one value; returns the cumulative sum if it raises an alarm, else None"""
+        if self.count < self.warmup:
+            # Learn the in-control mean and spread with Welford's update
+            self.count += 1
+            delta = value - self.target
+            self.target += delta / self.count
+            self._m2 += delta * (value - self.target)
+            return None
+        z = (value - self.target) / max(self.std, MIN_STD)
+        self.high = max(0.0, self.high + z - self.slack)
+        self.low = max(0.0, self.low - z - self.slack)
+        score = max(self.high, self.low)
+        if score > self.threshold:
+            # Re-learn the baseline so a lasting shift raises one alarm rather than one every few samples
+            self.reset()
+            return score
+        return None
+
+
+class ZScoreDetector:
+    """Z-score of each value against the rolling window of values before it"""
+
+    def __init__(self, window=60, threshold=4.5, warmup=50):
+        self.threshold = threshold
+        self.warmup = warmup
+        self.stats = RollingStats(window)
+        self.count = 0
+
+    def reset(self):
+        self.stats = RollingStats(self.stats.window)
+        self.count = 0
+
+    def update(self, value):
+        """Fold in one value; returns |z| if it raises an alarm, else None"""
+        alarm = None
+        # Count samples separately, the window never holds more than `window` of them even when warmup is longer
+        if self.count >= self.warmup and len(self.stats) > 1:
+            score = abs(value - self.stats.mean) / max(self.stats.std, MIN_STD)
+            if score > self.threshold:
+                alarm = score
+        self.count += 1
+        self.stats.update(value)
+        return alarm
+
+
+class AnomalyMonitor:
+    """EWMA, CUSUM and z-score detectors on the voltage, current and power of each sample"""
+
+    def __init__(self, settings=None, signals=SIGNALS):
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.signals = signals
+        self.alarm_count = 0
+        self.detectors = {signal: self._make_detectors() for signal in signals}
+
+    def _make_detectors(self):
+        s = self.settings
+        return {
+            EWMA: EwmaDetector(s["ewma_alpha"], s["ewma_threshold"], s["warmup"]),
+            CUSUM: CusumDetector(s["cusum_slack"], s["cusum_threshold"], s["warmup"]),
+            ZSCORE: ZScoreDetector(int(s["zscore_window"]), s["zscore_threshold"], s["warmup"]),
+        }
+
+    def reset(self):
+        self.alarm_count = 0
+        for detectors in self.detectors.values():
+            for detector in detectors.values():
+                detector.reset()
+
+    def update(self, sample):
+        """Feed one Sample to every detector; returns the list of alarms it raised (usually empty)"""
+        alarms = []
+        for signal, detectors in self.detectors.items():
+            value = getattr(sample, signal)
+            if math.isnan(value):
+                continue
+            for name, detector in detectors.items():
+                score = detector.update(value)
+                if score is not None:
+                    alarms.append(Alarm(sample.reading, sample.time_ns, sample.elapsed, signal, name,
+                                        value, score, detector.threshold))
+        self.alarm_count += len(alarms)
+        return alarms
+
+
+def alarm_text(alarm):
+    """One-line description of an alarm for status bars and logs"""
+    return (f"{alarm.signal.capitalize()} {alarm.detector.upper()} alarm at reading {alarm.reading} "
+            f"({alarm.value:.3f}, score {alarm.score:.1f} > {alarm.threshold:g})")
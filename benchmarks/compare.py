@@ -0,0 +1,96 @@
+"""Compare two benchmark reports (pipeline.py or startup.py JSON).
+
+Every numeric metric present in both reports is listed with its relative
+change. Metrics ending in _per_s are better when higher, all others (times,
+bytes) when lower. Rows of size sweeps are matched by their sample count, the
+latency results by their transport.
+
+    python benchmarks/compare.py before.json after.json --threshold 10
+
+Exits with status 1 when any metric got worse by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+# Keys that describe a measurement rather than measure something
+IDENTITY_KEYS = {"samples", "frames", "rate", "record_bytes", "malformed", "points_drawn"}
+
+
+def flatten(node, prefix=""):
+    """{dotted metric path: value} for every numeric leaf; sweep rows are keyed by their sample count"""
+    metrics = {}
+    if isinstance(node, dict):
+        if isinstance(node.get("transport"), str):
+            prefix = f"{prefix}[{node['transport']}]"  # loop:// and pty latencies are not comparable
+        for key, value in node.items():
+            if key in IDENTITY_KEYS:
+                continue
+            metrics.update(flatten(value, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(node, list):
+        for row in node:
+            if isinstance(row, dict) and "samples" in row:
+                metrics.update(flatten(row, f"{prefix}[{row['samples']}]"))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        metrics[prefix] = node
+    return metrics
+
+
+def higher_is_better(metric):
+    return metric.endswith("_per_s")
+
+
+def compare(old, new):
+    """(metric, old, new, change in percent, worse) for each metric of both reports"""
+    old_metrics = flatten(old.get("results", old.get("summary", {})))
+    new_metrics = flatten(new.get("results", new.get("summary", {})))
+    rows = []
+    for metric, before in old_metrics.items():
+        after = new_metrics.get(metric)
+        if after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        worse = change < 0 if higher_is_better(metric) else change > 0
+        rows.append((metric, before, after, change, worse))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports")
+    parser.add_argument("old", help="Baseline report")
+    parser.add_argument("new", help="Report to check against the baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change beyond which a metric counts as a regression")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if old.get("benchmark") != new.get("benchmark"):
+        print(f"Error: cannot compare a {old.get('benchmark')} report with a {new.get('benchmark')} report",
+              file=sys.stderr)
+        return 2
+
+    rows = compare(old, new)
+    print(f"{old.get('revision') or args.old} -> {new.get('revision') or args.new}")
+    width = max((len(metric) for metric, *_ in rows), default=10)
+    regressions = 0
+    for metric, before, after, change, worse in rows:
+        flag = ""
+        if abs(change) > args.threshold:
+            flag = "REGRESSION" if worse else "improved"
+            regressions += worse
+        print(f"{metric:<{width}}  {before:>12g}  {after:>12g}  {change:+7.1f}%  {flag}")
+    if regressions:
+        print(f"{regressions} metric(s) regressed by more than {args.threshold:g}%", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
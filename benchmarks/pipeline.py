@@ -0,0 +1,298 @@
+"""Acquisition and display pipeline benchmarks against a simulated Arduino.
+
+Every case runs headless (matplotlib Agg, no Tk window) and reports JSON:
+
+    parse         FrameParser throughput on the sketch's byte stream, with noise
+                  and corrupted lines, fed in serial-sized chunks
+    latency       device write to on_sample callback through AcquisitionEngine,
+                  over pyserial loop:// or a pty (simulated_device)
+    memory        bytes held per sample by the store and the plot's min/max pyramid
+    plot_refresh  full redraw and one live tick of the graph (Gui_App.render_series
+                  into LivePlot)
+    table_open    snapshot and first page of the data table, and a sort by voltage
+
+parse, memory, plot_refresh and table_open run at every size in --sizes.
+
+    python benchmarks/pipeline.py --output before.json
+    python benchmarks/pipeline.py --sizes 1000,100000 --transport pty --output after.json
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+import serial  # noqa: E402
+
+from acquisition import AcquisitionEngine, open_transport  # noqa: E402
+from decimation import MinMaxPyramid  # noqa: E402
+from frame_parser import FrameParser  # noqa: E402
+from sample_store import SAMPLE_DTYPE, SampleStore  # noqa: E402
+from simulated_device import SimulatedDevice, banner_bytes  # noqa: E402
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+# Bytes handed to the parser per read, about what a USB serial read returns
+READ_CHUNK = 4096
+
+# Samples appended between two live plot refreshes, and refreshes timed per size
+TICK_SAMPLES = 100
+TICKS = 20
+
+
+def best_of(repeat, func):
+    """Smallest wall time of `repeat` calls in seconds, and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def synthetic_records(n, rate=10.0, seed=0):
+    """n sample records as the engine would produce them at `rate` readings per second"""
+    rng = np.random.default_rng(seed)
+    records = np.zeros(n, dtype=SAMPLE_DTYPE)
+    records["reading"] = np.arange(1, n + 1)
+    records["elapsed"] = np.arange(n) / rate
+    records["time_ns"] = 1_700_000_000_000_000_000 + (records["elapsed"] * 1e9).astype(np.int64)
+    records["voltage"] = 12.0 + rng.normal(0.0, 0.05, n)
+    records["current"] = 0.5 + rng.normal(0.0, 0.01, n)
+    records["power"] = records["voltage"] * records["current"]
+    records["energy"] = np.cumsum(records["power"]) / rate
+    records["power_mean"] = records["power"]
+    records["power_std"] = 0.0
+    records["power_min"] = records["power"]
+    records["power_max"] = records["power"]
+    return records
+
+
+# --- Cases ---
+def bench_parse(n, repeat, corruption):
+    device = SimulatedDevice(noise=0.01, corruption=corruption, seed=n)
+    data = banner_bytes() + device.generate(n)
+    chunks = [data[i:i + READ_CHUNK] for i in range(0, len(data), READ_CHUNK)]
+
+    def parse():
+        parser = FrameParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser
+
+    seconds, parser = best_of(repeat, parse)
+    return {
+        "samples": n,
+        "seconds": round(seconds, 4),
+        "frames_per_s": round(parser.frames / seconds),
+        "mb_per_s": round(len(data) / seconds / 1e6, 2),
+        "malformed": parser.malformed,
+    }
+
+
+def bench_latency(frames, rate, transport_name):
+    """Per-reading delay from the device write to the engine's on_sample callback"""
+    sent = np.zeros(frames, dtype=np.int64)
+    received = np.zeros(frames, dtype=np.int64)
+
+    def on_sample(sample):
+        received[sample.reading - 1] = time.perf_counter_ns()
+
+    device = SimulatedDevice(rate=rate, noise=0.01, readings=frames, boot_time=0.2, seed=1)
+    if transport_name == "pty":
+        def on_write(first, count):
+            sent[first:first + count] = time.perf_counter_ns()
+
+        device.on_write = on_write
+        transport = open_transport(device.start(), timeout=1)
+        feeder = None
+    else:
+        transport = serial.serial_for_url("loop://", timeout=1)
+
+        def feed():
+            time.sleep(device.boot_time)  # after the engine flushed its input buffer
+            transport.write(banner_bytes())
+            started = time.perf_counter()
+            for i in range(frames):
+                delay = started + i / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                sent[i] = time.perf_counter_ns()
+                transport.write(device.generate(1))
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+    engine = AcquisitionEngine(transport, readings=frames, settle_time=0.0, on_sample=on_sample)
+    try:
+        count = engine.run()
+    finally:
+        device.stop()
+        if feeder:
+            feeder.join()
+    latency_ms = (received[:count] - sent[:count]) / 1e6
+    return {
+        "transport": transport_name,
+        "rate": rate,
+        "frames": count,
+        "p50_ms": round(float(np.percentile(latency_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latency_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latency_ms, 99)), 3),
+        "max_ms": round(float(latency_ms.max()), 3),
+    }
+
+
+def bench_memory(n):
+    """Bytes per sample held by the store and the plot pyramid, filled tick by tick like the GUI"""
+    records = synthetic_records(n)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    store = SampleStore()
+    pyramid = MinMaxPyramid()
+    for begin in range(0, n, TICK_SAMPLES):
+        store.extend(records[begin:begin + TICK_SAMPLES])
+        pyramid.update(store.column("voltage"))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "samples": n,
+        "record_bytes": store.record_size,
+        "store_bytes_per_sample": round(store.bytes_per_sample, 1),
+        "retained_bytes_per_sample": round((current - before) / n, 1),
+        "peak_bytes_per_sample": round((peak - before) / n, 1),
+    }
+
+
+def bench_plot_refresh(n, repeat):
+    """The graph's data path and an Agg render: full redraw and one live tick"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from Gui_App import render_series
+    from live_plot import LivePlot
+
+    records = synthetic_records(n + TICK_SAMPLES * TICKS)
+    store = SampleStore()
+    store.extend(records[:n])
+    fig = Figure(figsize=(8, 5), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    live_plot = LivePlot(canvas, ax)
+    canvas.draw()  # font and text layout caches, paid once per process rather than per redraw
+    max_points = 2 * max(int(ax.bbox.width), 100)  # what MonitoringApp.get_render_series asks for
+    pyramid = None
+
+    def full_redraw():
+        nonlocal pyramid
+        pyramid = MinMaxPyramid()  # plot_results after a run starts from scratch
+        x, y, _ = render_series(store, "elapsed", "voltage", pyramid, max_points=max_points)
+        live_plot.reset()
+        live_plot.update(x, y, force=True)
+        canvas.draw()
+        return len(x)
+
+    full_seconds, points = best_of(repeat, full_redraw)
+    ticks = []
+    for i in range(TICKS):
+        store.extend(records[n + i * TICK_SAMPLES:n + (i + 1) * TICK_SAMPLES])
+        start = time.perf_counter()
+        x, y, _ = render_series(store, "elapsed", "voltage", pyramid, max_points=max_points)
+        live_plot.update(x, y, force=True)
+        ticks.append(time.perf_counter() - start)
+    return {
+        "samples": n,
+        "points_drawn": points,
+        "full_ms": round(full_seconds * 1000, 2),
+        "tick_ms": round(statistics.median(ticks) * 1000, 3),
+    }
+
+
+def bench_table_open(n, repeat):
+    """What opening the data table and sorting it cost besides the fixed-size Tk widgets"""
+    from data_table import TABLE_COLUMNS, format_page, view_rows
+
+    store = SampleStore()
+    store.extend(synthetic_records(n))
+    open_seconds, _ = best_of(repeat, lambda: format_page(store.view(), TABLE_COLUMNS, None, 0, 25))
+    sort_seconds, _ = best_of(repeat, lambda: view_rows(store.view(), "voltage"))
+    return {
+        "samples": n,
+        "open_ms": round(open_seconds * 1000, 3),
+        "sort_ms": round(sort_seconds * 1000, 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parsing, latency, memory, plotting and the data table")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated sample counts for the size sweeps")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best one is reported")
+    parser.add_argument("--corruption", type=float, default=0.001, help="Probability that a line is damaged")
+    parser.add_argument("--transport", choices=["loop", "pty"], default="loop", help="Latency test transport")
+    parser.add_argument("--rate", type=float, default=200.0, help="Readings per second in the latency test")
+    parser.add_argument("--latency-frames", type=int, default=1000)
+    parser.add_argument("--only", help="Comma-separated cases to run (parse, latency, memory, plot_refresh, "
+                                       "table_open)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(float(size)) for size in args.sizes.split(",")]
+    except ValueError:
+        parser.error("--sizes must be comma-separated numbers")
+    cases = args.only.split(",") if args.only else ["parse", "latency", "memory", "plot_refresh", "table_open"]
+
+    results = {}
+    for case in cases:
+        print(f"Running {case}...", file=sys.stderr)
+        if case == "parse":
+            results[case] = [bench_parse(n, args.repeat, args.corruption) for n in sizes]
+        elif case == "latency":
+            results[case] = bench_latency(args.latency_frames, args.rate, args.transport)
+        elif case == "memory":
+            results[case] = [bench_memory(n) for n in sizes]
+        elif case == "plot_refresh":
+            results[case] = [bench_plot_refresh(n, args.repeat) for n in sizes]
+        elif case == "table_open":
+            results[case] = [bench_table_open(n, args.repeat) for n in sizes]
+        else:
+            parser.error(f"Unknown case {case}")
+
+    report = {
+        "benchmark": "pipeline",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
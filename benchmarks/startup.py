@@ -0,0 +1,116 @@
+"""Start-up benchmark for the GUI: time to first frame.
+
+Every run launches a fresh interpreter (so nothing is cached in-process) that
+imports Gui_App, builds MonitoringApp and waits until the window is mapped and
+painted. Reported per run, in milliseconds:
+
+    import_ms       importing Gui_App
+    construct_ms    MonitoringApp() until __init__ returns
+    first_frame_ms  process launch until the first frame is on screen
+    ports_ms        process launch until the background port scan filled the menu
+
+    python benchmarks/startup.py --runs 10 --output startup.json
+
+Needs a display; on a headless Linux box run it under xvfb-run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter, prints one JSON line of absolute time.time() stamps
+CHILD = r"""
+import json, time
+stamps = {"start": time.time()}
+import Gui_App
+stamps["imported"] = time.time()
+app = Gui_App.MonitoringApp()
+stamps["constructed"] = time.time()
+
+def first_frame():
+    app.update()
+    stamps["first_frame"] = time.time()
+    wait_for_ports()
+
+def wait_for_ports(deadline=time.time() + 30):
+    if app.available_ports or time.time() > deadline:
+        stamps["ports"] = time.time()
+        print(json.dumps(stamps), flush=True)
+        app.destroy()
+    else:
+        app.after(5, wait_for_ports)
+
+app.wait_visibility()
+app.after_idle(first_frame)
+app.mainloop()
+"""
+
+
+def run_once(timeout):
+    """Launch one child, returns the per-stage durations in ms"""
+    launched = time.time()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=REPO_ROOT, capture_output=True,
+                            text=True, timeout=timeout)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"Start-up run failed (exit {result.returncode}):\n{result.stderr.strip()}")
+    stamps = json.loads(lines[-1])
+    return {
+        "import_ms": (stamps["imported"] - stamps["start"]) * 1000,
+        "construct_ms": (stamps["constructed"] - stamps["imported"]) * 1000,
+        "first_frame_ms": (stamps["first_frame"] - launched) * 1000,
+        "ports_ms": (stamps["ports"] - launched) * 1000,
+    }
+
+
+def summarize(runs):
+    summary = {}
+    for name in runs[0]:
+        values = [run[name] for run in runs]
+        summary[name] = {
+            "median": round(statistics.median(values), 1),
+            "min": round(min(values), 1),
+            "max": round(max(values), 1),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure GUI time-to-first-frame")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds allowed per run")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("Error: no DISPLAY, run under xvfb-run on headless machines", file=sys.stderr)
+        return 1
+    try:
+        runs = [run_once(args.timeout) for _ in range(args.runs)]
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    report = {
+        "benchmark": "startup",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [{name: round(value, 1) for name, value in run.items()} for run in runs],
+        "summary": summarize(runs),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
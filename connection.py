@@ -0,0 +1,223 @@
+"""Persistent serial connection shared by consecutive experiments.
+
+Opening the port toggles DTR, which resets the Arduino: the sketch needs about
+two seconds to boot, recalibrates the ACS712 zero-current offset and prints its
+banner before the first reading. ConnectionManager opens the port once, keeps
+it open between experiments and remembers the calibration offset from the
+banner, so every run after the first starts on the live stream at once.
+
+The manager is also the engine's transport. A read that fails because the
+device went away (USB cable pulled, board powered off) closes the port and
+reopens it with exponential backoff; the engine just sees a slow read. The
+reopened board resets and prints a new banner, which the manager picks up.
+
+    connection = ConnectionManager("COM3", baudrate=9600)
+    connection.arm()
+    connection.engine(readings=100, on_sample=print).run()
+    connection.engine(readings=100, on_sample=print).run()  # no reset, no banner wait
+    connection.close()
+"""
+import logging
+import threading
+import time
+
+import serial
+
+from acquisition import AcquisitionEngine, open_transport
+from diagnostics import METRICS, RECONNECTS
+from frame_parser import CALIBRATION_PREFIX, parse_field
+
+try:
+    import termios
+    PORT_ERRORS = (OSError, termios.error)  # tcflush on a vanished tty raises termios.error
+except ImportError:  # Windows
+    PORT_ERRORS = (OSError,)
+
+log = logging.getLogger(__name__)
+
+# Standard rates offered for the port; the stock sketch uses 9600
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200]
+
+# Longest partial line kept while looking for the calibration banner
+MAX_BANNER_LINE = 256
+
+# Seconds the port stays closed before it is reopened to reset the board; the auto-reset
+# circuit only fires on a fresh DTR edge, so an immediate reopen may not reset it
+RESET_HOLD = 0.25
+
+
+class ConnectionManager:
+    """Keeps one serial port open across experiments and reconnects it when the device drops out"""
+
+    def __init__(self, port, baudrate=9600, timeout=2, settle_time=2.0, banner_timeout=10.0,
+                 min_backoff=0.5, max_backoff=10.0, on_status=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.settle_time = settle_time  # boot time of the board after the port is opened
+        self.banner_timeout = banner_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.on_status = on_status  # reconnect progress: on_status(text, color), from the reading thread
+        self.calibration_offset = None  # mV, from the banner since the port was last opened
+        self.reconnects = 0
+        self._serial = None
+        self._opened_at = None
+        self._banner = bytearray()
+        self._banner_pending = False  # an engine was handed out before the banner had been seen
+        self._closed = False
+        self._interrupt = threading.Event()
+
+    @property
+    def is_open(self):
+        return self._serial is not None
+
+    def open(self):
+        """Open the port if it is not open yet; raises serial.SerialException"""
+        if self._serial is None:
+            self._serial = open_transport(self.port, baudrate=self.baudrate, timeout=self.timeout)
+            self._opened_at = time.monotonic()
+            self.calibration_offset = None  # the board was reset and calibrates again
+            self._banner.clear()
+            log.info("Opened %s at %d baud", self.port, self.baudrate)
+
+    def arm(self):
+        """Prepare for the next experiment: open the port, or check that the open one is still alive"""
+        self._closed = False
+        self._interrupt.clear()
+        if self._serial is not None:
+            try:
+                self._serial.in_waiting
+            except PORT_ERRORS as e:
+                self._lost(e)
+        self.open()
+
+    def set_baudrate(self, baudrate):
+        """Change the rate in place; unlike reopening, this does not reset the board"""
+        if self._serial is not None and baudrate != self.baudrate:
+            self._serial.baudrate = baudrate
+        self.baudrate = baudrate
+
+    def engine(self, **kwargs):
+        """AcquisitionEngine on this connection; skips the boot wait and banner once calibrated"""
+        self.arm()
+        if self.calibration_offset is None and self._banner_pending:
+            # The last run ended before the banner (stopped while connecting, or it timed out) and
+            # may have flushed it. The board prints it only after a reset, which reopening triggers.
+            log.info("No calibration banner from %s yet, reopening the port to reset the board", self.port)
+            self._close_port()
+            time.sleep(RESET_HOLD)
+            self.open()
+        self._banner_pending = self.calibration_offset is None
+        self.on_status = kwargs.get("on_status", self.on_status)
+        if self.calibration_offset is None:
+            # Only the part of the boot time that has not passed since the port was opened
+            settle_time = max(self.settle_time - (time.monotonic() - self._opened_at), 0.0)
+        else:
+            settle_time = 0.0
+        return AcquisitionEngine(self, settle_time=settle_time, banner_timeout=self.banner_timeout,
+                                 close_transport=False, calibration_offset=self.calibration_offset, **kwargs)
+
+    def interrupt(self):
+        """Abandon a reconnect in progress; the pending read returns no data. Called by engine.stop()"""
+        self._interrupt.set()
+
+    def close(self):
+        """Close the port for good; a reader blocked on it fails with SerialException"""
+        self._closed = True
+        self._interrupt.set()
+        if self._serial is not None:
+            self._close_port()
+            log.info("Closed %s", self.port)
+
+    # --- Transport interface used by AcquisitionEngine ---
+    @property
+    def in_waiting(self):
+        if self._serial is None:
+            return 0
+        try:
+            return self._serial.in_waiting
+        except PORT_ERRORS as e:
+            self._lost(e)
+            return 0
+
+    def read(self, size=1):
+        while True:
+            if self._serial is None and not self._reconnect():
+                return b""
+            try:
+                data = self._serial.read(size)
+            except PORT_ERRORS as e:
+                self._lost(e)
+                continue
+            except Exception:
+                if self._closed:  # close() on another thread took the port away mid-read
+                    raise serial.SerialException(f"Connection to {self.port} was closed")
+                raise
+            if self.calibration_offset is None and data:
+                self._watch_banner(data)
+            return data
+
+    def reset_input_buffer(self):
+        self._banner.clear()
+        if self._serial is None:
+            return
+        try:
+            self._serial.reset_input_buffer()
+        except PORT_ERRORS as e:
+            self._lost(e)
+
+    # --- Internals ---
+    def _status(self, text, color):
+        if self.on_status:
+            self.on_status(text, color)
+
+    def _watch_banner(self, data):
+        """Pick the calibration offset out of the stream until the banner has gone by"""
+        self._banner += data
+        lines = self._banner.split(b"\n")
+        self._banner = bytearray(lines.pop()[-MAX_BANNER_LINE:])
+        for line in lines:
+            line = line.strip()
+            if line.startswith(CALIBRATION_PREFIX):
+                self.calibration_offset = parse_field(line, CALIBRATION_PREFIX, b"mV")
+
+    def _close_port(self):
+        try:
+            self._serial.close()
+        except PORT_ERRORS:
+            pass
+        self._serial = None
+        self.calibration_offset = None
+
+    def _lost(self, error):
+        if self._closed:
+            raise serial.SerialException(f"Connection to {self.port} was closed")
+        log.warning("Lost connection to %s: %s", self.port, error)
+        self._status("Status: Connection lost, reconnecting...", "orange")
+        self._close_port()
+
+    def _reconnect(self):
+        """Reopen the port, waiting min_backoff, 2x, 4x ... max_backoff between attempts.
+
+        Returns False when interrupted; raises SerialException once close() was called.
+        """
+        delay = self.min_backoff
+        while True:
+            if self._closed:
+                raise serial.SerialException(f"Connection to {self.port} was closed")
+            if self._interrupt.is_set():
+                return False
+            try:
+                self.open()
+            except serial.SerialException as e:
+                log.info("Reconnecting to %s failed (%s), next attempt in %.1fs", self.port, e, delay)
+                self._status(f"Status: {self.port} unavailable, retrying in {delay:g}s...", "orange")
+                if self._interrupt.wait(delay) and not self._closed:
+                    return False
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            self.reconnects += 1
+            METRICS.count(RECONNECTS)
+            self._status("Status: Reconnected, waiting for the device...", "yellow")
+            return True
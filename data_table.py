@@ -0,0 +1,199 @@
+"""Virtualized data table window for the collected samples.
+
+Only the rows that fit in the window are ever formatted. Sorting and filtering
+work on index arrays computed with vectorized NumPy operations over the sample
+columns, so opening, scrolling and re-sorting cost the same for ten readings
+as for ten million.
+"""
+import operator
+
+import customtkinter as ctk
+import numpy as np
+
+# (header, field, format) for every column shown in the table
+TABLE_COLUMNS = [
+    ("Reading", "reading", "{:<8d}"),
+    ("Voltage (V)", "voltage", "{:<11.4f}"),
+    ("Current (A)", "current", "{:<11.4f}"),
+    ("Time (s)", "elapsed", "{:<10.2f}"),
+    ("Power (W)", "power", "{:<10.4f}"),
+    ("Energy (J)", "energy", "{:<12.3f}"),
+    ("Mean P (W)", "power_mean", "{:<10.4f}"),
+    ("Std P (W)", "power_std", "{:<10.4f}"),
+    ("Min P (W)", "power_min", "{:<10.4f}"),
+    ("Max P (W)", "power_max", "{:<10.4f}"),
+]
+
+FILTER_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def view_rows(samples, sort_field="reading", descending=False, row_filter=None):
+    """Row index array in display order, or None for all rows in acquisition order.
+
+    row_filter is (field, operator symbol, threshold) or None.
+    """
+    rows = None
+    if row_filter is not None:
+        field, symbol, threshold = row_filter
+        rows = np.flatnonzero(FILTER_OPERATORS[symbol](samples[field], threshold))
+    if sort_field != "reading" or descending:
+        keys = samples[sort_field] if rows is None else samples[sort_field][rows]
+        order = np.argsort(keys, kind="stable")
+        if descending:
+            order = order[::-1]
+        rows = order if rows is None else rows[order]
+    return rows
+
+
+def format_page(samples, columns, rows, offset, page_size):
+    """Header, rule and one text line per row of the page starting at offset"""
+    count = len(samples) if rows is None else len(rows)
+    end = min(offset + page_size, count)
+    page = samples[offset:end] if rows is None else samples[rows[offset:end]]
+
+    header = " | ".join(f"{title:<{len(fmt.format(0))}}" for title, _, fmt in columns)
+    lines = [header, "-" * len(header)]
+    values = [(page[field], fmt) for _, field, fmt in columns]
+    for i in range(len(page)):
+        lines.append(" | ".join(fmt.format(column[i]) for column, fmt in values))
+    return lines
+
+
+class DataTableWindow(ctk.CTkToplevel):
+    """Paginated view of a SampleStore (or anything with view()) that renders only the visible rows"""
+
+    def __init__(self, master, source, columns=TABLE_COLUMNS, page_size=25, title="Collected Data"):
+        super().__init__(master)
+        self.samples = source.view()  # snapshot of the rows present when the window opened
+        self.columns = [column for column in columns if column[1] in self.samples.dtype.names]
+        self.page_size = page_size
+        self.rows = None  # index array after filter/sort, None means all rows in acquisition order
+        self.offset = 0
+
+        self.title(f"{title} - {len(self.samples)} readings")
+        self.geometry("980x520")
+
+        self.setup_toolbar()
+
+        body = ctk.CTkFrame(self)
+        body.pack(expand=True, fill="both", padx=5, pady=5)
+        self.textbox = ctk.CTkTextbox(body, font=("Courier", 12), wrap="none", activate_scrollbars=False)
+        self.textbox.pack(side="left", expand=True, fill="both")
+        self.scrollbar = ctk.CTkScrollbar(body, command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.textbox.bind(sequence, self.on_mouse_wheel)
+
+        self.footer = ctk.CTkLabel(self, text="", text_color="gray")
+        self.footer.pack(fill="x", padx=10, pady=(0, 5))
+
+        self.render()
+
+    def setup_toolbar(self):
+        headers = [header for header, _, _ in self.columns]
+        toolbar = ctk.CTkFrame(self)
+        toolbar.pack(fill="x", padx=5, pady=5)
+
+        # Jump to row
+        ctk.CTkLabel(toolbar, text="Row:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.jump_entry = ctk.CTkEntry(toolbar, width=90, placeholder_text="e.g., 1000")
+        self.jump_entry.grid(row=0, column=1, padx=5, pady=5)
+        self.jump_entry.bind("<Return>", lambda event: self.jump_to_row())
+        ctk.CTkButton(toolbar, text="Go", width=50, command=self.jump_to_row).grid(row=0, column=2, padx=5, pady=5)
+
+        # Sorting
+        ctk.CTkLabel(toolbar, text="Sort:").grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        self.sort_menu = ctk.CTkOptionMenu(toolbar, values=headers, width=120, command=lambda value: self.apply_view())
+        self.sort_menu.set(headers[0])
+        self.sort_menu.grid(row=0, column=4, padx=5, pady=5)
+        self.descending = ctk.CTkCheckBox(toolbar, text="Desc", width=60, command=self.apply_view)
+        self.descending.grid(row=0, column=5, padx=5, pady=5)
+
+        # Filtering, e.g. Current (A) > 1.5
+        ctk.CTkLabel(toolbar, text="Filter:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.filter_column_menu = ctk.CTkOptionMenu(toolbar, values=headers, width=120)
+        self.filter_column_menu.set(headers[min(2, len(headers) - 1)])
+        self.filter_column_menu.grid(row=1, column=1, columnspan=2, padx=5, pady=5)
+        self.filter_operator_menu = ctk.CTkOptionMenu(toolbar, values=list(FILTER_OPERATORS), width=60)
+        self.filter_operator_menu.set(">")
+        self.filter_operator_menu.grid(row=1, column=3, padx=5, pady=5)
+        self.filter_entry = ctk.CTkEntry(toolbar, width=90, placeholder_text="threshold")
+        self.filter_entry.grid(row=1, column=4, padx=5, pady=5)
+        self.filter_entry.bind("<Return>", lambda event: self.apply_view())
+        self.filter_enabled = ctk.CTkCheckBox(toolbar, text="On", width=60, command=self.apply_view)
+        self.filter_enabled.grid(row=1, column=5, padx=5, pady=5)
+
+    def field_for(self, header):
+        return next(field for title, field, _ in self.columns if title == header)
+
+    def apply_view(self):
+        """Recompute the filtered and sorted row index with vectorized masks"""
+        row_filter = None
+        if self.filter_enabled.get():
+            try:
+                threshold = float(self.filter_entry.get())
+            except ValueError:
+                self.footer.configure(text="Filter threshold must be a number", text_color="red")
+                return
+            row_filter = (self.field_for(self.filter_column_menu.get()), self.filter_operator_menu.get(), threshold)
+
+        self.rows = view_rows(self.samples, self.field_for(self.sort_menu.get()), bool(self.descending.get()),
+                              row_filter)
+        self.offset = 0
+        self.render()
+
+    @property
+    def row_count(self):
+        return len(self.samples) if self.rows is None else len(self.rows)
+
+    def jump_to_row(self):
+        try:
+            row = int(self.jump_entry.get())
+        except ValueError:
+            self.footer.configure(text="Row must be a whole number", text_color="red")
+            return
+        self.scroll_to(row - 1)
+
+    def scroll_to(self, offset):
+        self.offset = int(min(max(offset, 0), max(self.row_count - self.page_size, 0)))
+        self.render()
+
+    def on_scroll(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.row_count)
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_mouse_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    def render(self):
+        """Format and show only the rows of the current page"""
+        count = self.row_count
+        end = min(self.offset + self.page_size, count)
+        lines = format_page(self.samples, self.columns, self.rows, self.offset, self.page_size)
+
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", ctk.END)
+        self.textbox.insert("1.0", "\n".join(lines))
+        self.textbox.configure(state="disabled")  # Make it read-only
+
+        if count:
+            self.scrollbar.set(self.offset / count, end / count)
+            self.footer.configure(text=f"Rows {self.offset + 1}-{end} of {count}", text_color="gray")
+        else:
+            self.scrollbar.set(0, 1)
+            self.footer.configure(text="No rows match the filter", text_color="gray")
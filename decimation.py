@@ -0,0 +1,137 @@
+"""Multi-resolution min/max decimation of an append-only column.
+
+MinMaxPyramid keeps, for every level k >= 1, one bucket per factor**k rows
+with the bucket's min, max and sum. Each level is built from complete buckets
+of the level below, so appending n rows costs O(n) vectorized work and the
+whole pyramid holds about 1/(factor - 1) as many buckets as there are rows.
+
+envelope() answers "what should be drawn for rows [start, stop) on a plot
+that is w pixels wide": it picks the coarsest level that still has no more
+buckets than pixels and emits each bucket's min and max, so peaks stay
+visible at every zoom while the number of points stays bounded (about 2w
+plus a few buckets at the edges).
+
+update() reads the new rows a block at a time, so a pyramid over a memory-mapped
+journal column never holds more than one block of it in memory.
+"""
+import numpy as np
+
+# Rows read and aggregated per step of update()
+UPDATE_BLOCK = 1 << 20
+
+
+class _Level:
+    """Complete buckets of one pyramid level in growable arrays"""
+
+    def __init__(self, capacity=256):
+        self.mins = np.empty(capacity)
+        self.maxs = np.empty(capacity)
+        self.sums = np.empty(capacity)
+        self.count = 0
+
+    def extend(self, mins, maxs, sums):
+        n = len(mins)
+        if self.count + n > len(self.mins):
+            capacity = len(self.mins)
+            while capacity < self.count + n:
+                capacity *= 2
+            for name in ("mins", "maxs", "sums"):
+                grown = np.empty(capacity)
+                grown[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, grown)
+        self.mins[self.count:self.count + n] = mins
+        self.maxs[self.count:self.count + n] = maxs
+        self.sums[self.count:self.count + n] = sums
+        self.count += n
+
+
+class MinMaxPyramid:
+    """Per-bucket min/max/mean levels over an append-only column, updated incrementally"""
+
+    def __init__(self, factor=4):
+        if factor < 2:
+            raise ValueError("factor must be at least 2")
+        self.factor = factor
+        self.levels = []  # levels[k - 1] has buckets of factor**k rows
+        self.rows = 0  # rows of the column aggregated into level 1 so far (a multiple of factor)
+
+    def bucket_size(self, level):
+        return self.factor ** level
+
+    def update(self, values):
+        """Aggregate the rows of `values` (the full column, which only ever grows) not seen yet"""
+        f = self.factor
+        while True:
+            complete = min((len(values) - self.rows) // f, UPDATE_BLOCK // f)
+            if complete <= 0:
+                return
+            block = np.asarray(values[self.rows:self.rows + complete * f], dtype=float).reshape(-1, f)
+            self.rows += complete * f
+            # fmin/fmax ignore NaN unless a whole bucket is NaN
+            self._fold(np.fmin.reduce(block, axis=1), np.fmax.reduce(block, axis=1), np.nansum(block, axis=1))
+
+    def _fold(self, mins, maxs, sums):
+        """Append new level-1 buckets and carry complete groups of them up the levels"""
+        f = self.factor
+        level = 0
+        while True:
+            if level == len(self.levels):
+                self.levels.append(_Level())
+            self.levels[level].extend(mins, maxs, sums)
+            below = self.levels[level]
+            # Buckets of this level already folded into the next one
+            consumed = self.levels[level + 1].count * f if level + 1 < len(self.levels) else 0
+            complete = (below.count - consumed) // f
+            if complete <= 0:
+                return
+            span = slice(consumed, consumed + complete * f)
+            mins = np.fmin.reduce(below.mins[span].reshape(-1, f), axis=1)
+            maxs = np.fmax.reduce(below.maxs[span].reshape(-1, f), axis=1)
+            sums = below.sums[span].reshape(-1, f).sum(axis=1)
+            level += 1
+
+    def level_for(self, rows, max_buckets):
+        """Finest level whose buckets over `rows` rows do not exceed max_buckets (0 means raw rows)"""
+        level = 0
+        while rows > max_buckets * self.bucket_size(level) and level < len(self.levels):
+            level += 1
+        return level
+
+    def means(self, level):
+        """Bucket means of a level"""
+        lv = self.levels[level - 1]
+        return lv.sums[:lv.count] / self.bucket_size(level)
+
+    def envelope(self, values, start, stop, max_points):
+        """Row positions and values to draw for values[start:stop] with at most about max_points points.
+
+        Returns (rows, ys) as float arrays; each bucket contributes its min and its
+        max at the bucket centre. Rows past the last complete bucket of the chosen
+        level are covered by finer levels and finally by the raw values.
+        """
+        stop = min(stop, len(values))
+        start = max(min(start, stop), 0)
+        level = self.level_for(stop - start, max(max_points // 2, 1))
+        if level == 0:
+            rows = np.arange(start, stop)
+            return rows.astype(float), np.asarray(values[start:stop], dtype=float)
+
+        parts_rows, parts_values = [], []
+        pos = start
+        for k in range(level, 0, -1):
+            size = self.bucket_size(k)
+            lv = self.levels[k - 1]
+            first = pos // size
+            last = min(-(-stop // size), lv.count)  # ceil(stop / size), limited to complete buckets
+            if last <= first:
+                continue
+            centres = np.arange(first, last) * size + (size - 1) / 2
+            parts_rows.append(np.repeat(centres, 2))
+            parts_values.append(np.column_stack((lv.mins[first:last], lv.maxs[first:last])).ravel())
+            pos = last * size
+            if pos >= stop:
+                break
+        if pos < stop:
+            parts_rows.append(np.arange(pos, stop, dtype=float))
+            parts_values.append(np.asarray(values[pos:stop], dtype=float))
+        return np.concatenate(parts_rows), np.concatenate(parts_values)
@@ -0,0 +1,170 @@
+"""Logging setup and hot-path timing counters.
+
+Modules log through ``logging.getLogger(__name__)`` with lazy %-style
+arguments, so a disabled level costs one integer comparison. Timings go to the
+process-wide METRICS registry: each named stage keeps a count, a total and a
+log2-bucketed histogram of durations, cheap enough to leave on for every
+sample. Nothing is recorded while METRICS.enabled is False.
+"""
+import json
+import logging
+import threading
+import time
+
+# Names of the stages timed along the acquisition and display path
+SERIAL_WAIT = "serial_wait"
+PARSE = "parse"
+STORE_APPEND = "store_append"
+PLOT_RENDER = "plot_render"
+SAMPLES = "samples"
+ALARMS = "alarms"
+RECONNECTS = "reconnects"
+
+# Histogram bucket i holds durations in [2**(i-1), 2**i) microseconds
+HISTOGRAM_BUCKETS = 32
+
+
+def configure_logging(level="WARNING", structured=False):
+    """Set up the root logger; structured=True writes one JSON object per line"""
+    handler = logging.StreamHandler()
+    if structured:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class Histogram:
+    """Count, total, min/max and log2 histogram of durations in nanoseconds"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def observe(self, duration_ns):
+        bucket = min((duration_ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        with self._lock:
+            self.count += 1
+            self.total_ns += duration_ns
+            if self.min_ns is None or duration_ns < self.min_ns:
+                self.min_ns = duration_ns
+            if duration_ns > self.max_ns:
+                self.max_ns = duration_ns
+            self.buckets[bucket] += 1
+
+    def percentile(self, fraction):
+        """Upper bound in microseconds of the bucket holding the given fraction of observations"""
+        with self._lock:
+            count, buckets = self.count, list(self.buckets)
+        return _percentile(buckets, count, fraction)
+
+    def snapshot(self):
+        # Copy under the lock so count, total and buckets describe the same observations
+        with self._lock:
+            count, total_ns, min_ns, max_ns = self.count, self.total_ns, self.min_ns, self.max_ns
+            buckets = list(self.buckets)
+        mean_us = total_ns / count / 1000 if count else 0.0
+        return {
+            "count": count,
+            "mean_us": round(mean_us, 3),
+            "min_us": round((min_ns or 0) / 1000, 3),
+            "max_us": round(max_ns / 1000, 3),
+            "p50_us": _percentile(buckets, count, 0.5),
+            "p99_us": _percentile(buckets, count, 0.99),
+            "histogram_us": {f"<{2 ** i}": n for i, n in enumerate(buckets) if n},
+        }
+
+
+def _percentile(buckets, count, fraction):
+    target = count * fraction
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if n and seen >= target:
+            return 2 ** i
+    return 0
+
+
+class Metrics:
+    """Registry of named duration histograms and event counters"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started = time.monotonic()
+
+    def observe(self, name, duration_ns):
+        """Record one duration (from time.perf_counter_ns() differences)"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        histogram.observe(duration_ns)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def rate(self, name):
+        """Events per second for a counter since the last reset"""
+        with self._lock:
+            count, started = self.counters.get(name, 0), self.started
+        elapsed = time.monotonic() - started
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        # Worker threads add counters and histograms while this runs; copy them under the lock, then format
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = sorted(self.histograms.items())
+            elapsed = time.monotonic() - self.started
+        return {
+            "uptime_s": round(elapsed, 3),
+            "counters": counters,
+            "rates_per_s": {name: round(n / elapsed if elapsed > 0 else 0.0, 3) for name, n in counters.items()},
+            "timings": {name: histogram.snapshot() for name, histogram in histograms},
+        }
+
+    def to_json(self, path=None):
+        """Return the snapshot as JSON, also writing it to path if given"""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+# Process-wide registry used by the engine, GUI and plot code
+METRICS = Metrics()
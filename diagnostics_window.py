@@ -0,0 +1,62 @@
+"""Optional panel that shows the live timing counters from diagnostics.METRICS."""
+from tkinter import filedialog
+
+import customtkinter as ctk
+
+REFRESH_MS = 1000
+
+
+class DiagnosticsWindow(ctk.CTkToplevel):
+    """Shows per-stage timing statistics and exports them as JSON"""
+
+    def __init__(self, master, metrics):
+        super().__init__(master)
+        self.metrics = metrics
+        self.title("Diagnostics")
+        self.geometry("560x420")
+
+        toolbar = ctk.CTkFrame(self)
+        toolbar.pack(fill="x", padx=5, pady=5)
+        self.enabled = ctk.CTkCheckBox(toolbar, text="Collect timings", command=self.on_toggle)
+        if metrics.enabled:
+            self.enabled.select()
+        self.enabled.pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(toolbar, text="Reset", width=70, command=self.on_reset).pack(side="left", padx=5, pady=5)
+        ctk.CTkButton(toolbar, text="Export JSON", width=100, command=self.on_export).pack(side="right", padx=5, pady=5)
+
+        self.textbox = ctk.CTkTextbox(self, font=("Courier", 12), wrap="none")
+        self.textbox.pack(expand=True, fill="both", padx=5, pady=5)
+        self.refresh()
+
+    def on_toggle(self):
+        self.metrics.enabled = bool(self.enabled.get())
+
+    def on_reset(self):
+        self.metrics.reset()
+        self.refresh(reschedule=False)
+
+    def on_export(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")], initialfile="diagnostics.json")
+        if path:
+            self.metrics.to_json(path)
+
+    def refresh(self, reschedule=True):
+        if not self.winfo_exists():
+            return
+        snapshot = self.metrics.snapshot()
+        lines = [f"Uptime: {snapshot['uptime_s']:.1f} s", ""]
+        for name, count in snapshot["counters"].items():
+            lines.append(f"{name:<14} {count:>10}  ({snapshot['rates_per_s'][name]:.2f}/s)")
+        lines.append("")
+        lines.append(f"{'stage':<14} {'count':>8} {'mean us':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>10}")
+        for name, timing in snapshot["timings"].items():
+            lines.append(f"{name:<14} {timing['count']:>8} {timing['mean_us']:>10.1f} {timing['p50_us']:>8} "
+                         f"{timing['p99_us']:>8} {timing['max_us']:>10.1f}")
+
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", ctk.END)
+        self.textbox.insert("1.0", "\n".join(lines))
+        self.textbox.configure(state="disabled")
+        if reschedule:
+            self.after(REFRESH_MS, self.refresh)
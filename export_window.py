@@ -0,0 +1,77 @@
+"""Progress dialog for a background export."""
+import threading
+
+import customtkinter as ctk
+
+from export import Exporter
+
+POLL_MS = 100
+
+
+class ExportWindow(ctk.CTkToplevel):
+    """Runs an Exporter on a worker thread and shows its progress with a cancel button"""
+
+    def __init__(self, master, records, path):
+        self.exporter = Exporter(records, path, on_progress=self.on_progress)  # raises ExportError first
+        super().__init__(master)
+        self.title(f"Export - {self.exporter.format}")
+        self.geometry("420x160")
+        self.progress = (0, len(records))  # written by the worker, read by poll()
+        self.finished = False
+        self.completed = False
+        self.error = None
+
+        self.label = ctk.CTkLabel(self, text=f"Exporting {len(records)} rows to {path}", wraplength=400)
+        self.label.pack(fill="x", padx=10, pady=(15, 5))
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill="x", padx=10, pady=5)
+        self.button = ctk.CTkButton(self, text="Cancel", command=self.on_cancel)
+        self.button.pack(pady=10)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        threading.Thread(target=self.run, name="export", daemon=True).start()
+        self.poll()
+
+    def on_progress(self, done, total):
+        """Exporter callback on the worker thread"""
+        self.progress = (done, total)
+
+    def run(self):
+        try:
+            self.completed = self.exporter.run()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+    def poll(self):
+        if not self.winfo_exists():
+            return
+        done, total = self.progress
+        self.progress_bar.set(done / total if total else 1.0)
+        if not self.finished:
+            self.after(POLL_MS, self.poll)
+            return
+        if self.error is not None:
+            self.label.configure(text=f"Export failed: {self.error}", text_color="red")
+        elif self.completed:
+            self.progress_bar.set(1.0)
+            # The progress total counts row x column steps for npz, report the records written
+            self.label.configure(text=f"Exported {len(self.exporter.records)} rows to {self.exporter.path}",
+                                 text_color="lime")
+        else:
+            self.label.configure(text="Export cancelled", text_color="orange")
+        self.button.configure(text="Close", state="normal")
+
+    def on_cancel(self):
+        if self.finished:
+            self.destroy()
+            return
+        self.exporter.cancel()
+        self.button.configure(text="Cancelling...", state="disabled")
+
+    def on_close(self):
+        """Closing the window cancels a running export"""
+        self.exporter.cancel()
+        self.destroy()
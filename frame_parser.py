@@ -0,0 +1,134 @@
+"""Incremental parser for the line protocol of Dc_Voltage_Current_Measurement.ino.
+
+The sketch prints a banner, one calibration line and then, forever:
+
+    Input Voltage: 12.34 V
+    Current: 0.512 A
+    -----------------------------
+
+FrameParser accepts bytes in whatever chunks the serial port hands out, splits
+complete lines off an internal buffer and pairs each voltage line with the
+current line that follows it. A frame is only emitted on the dashed separator,
+so a dropped or corrupted line costs exactly one frame and never shifts the
+readings that come after it. A line longer than max_line is noise: it is
+dropped and counted as one malformed line, however the reads split it up.
+"""
+
+VOLTAGE_PREFIX = b"Input Voltage:"
+CURRENT_PREFIX = b"Current:"
+CALIBRATION_PREFIX = b"Calibrated Current Sensor Offset:"
+
+# Parser states
+EXPECT_VOLTAGE = "expect_voltage"
+EXPECT_CURRENT = "expect_current"
+EXPECT_SEPARATOR = "expect_separator"
+RESYNC = "resync"  # skipping a broken frame until the next separator
+
+
+def is_separator(line):
+    return len(line) >= 3 and line.strip(b"-") == b""
+
+
+def parse_field(line, prefix, unit):
+    """Return the number after prefix if the line ends with unit, else None"""
+    parts = line[len(prefix):].split()
+    if len(parts) != 2 or parts[1] != unit:
+        return None
+    try:
+        return float(parts[0])
+    except ValueError:
+        return None
+
+
+class FrameParser:
+    """State machine that turns a byte stream into (voltage, current) frames"""
+
+    def __init__(self, max_line=256):
+        self.max_line = max_line
+        self._buffer = bytearray()
+        self._discarding = False  # inside an overlong line, skipping to its end
+        self.state = EXPECT_VOLTAGE
+        self._voltage = None
+        self._current = None
+        self.calibration_offset = None  # mV, from the startup banner
+        self.frames = 0
+        self.malformed = 0
+        self.bytes_received = 0
+
+    def reset(self):
+        """Drop buffered bytes and any half-read frame, keep the counters"""
+        self._buffer.clear()
+        self._discarding = False
+        self.state = EXPECT_VOLTAGE
+
+    def resync(self):
+        """Start at the next frame boundary, e.g. after joining a stream mid-line; not counted as malformed"""
+        self._buffer.clear()
+        self._discarding = False
+        self.state = RESYNC
+
+    def feed(self, data):
+        """Consume a chunk of bytes and return the list of complete (voltage, current) frames"""
+        self.bytes_received += len(data)
+        self._buffer += data
+        if b"\n" not in data:
+            if len(self._buffer) > self.max_line:
+                # No line ending in sight, this is noise rather than protocol
+                self._buffer.clear()
+                if not self._discarding:
+                    self._discarding = True
+                    self._malformed()
+            return []
+
+        lines = self._buffer.split(b"\n")
+        self._buffer = bytearray(lines.pop())  # trailing partial line
+        frames = []
+        for line in lines:
+            if self._discarding:
+                self._discarding = False  # the end of the overlong line, already counted
+                continue
+            if len(line) > self.max_line:
+                self._malformed()
+                continue
+            frame = self.feed_line(line.strip())
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    def feed_line(self, line):
+        """Advance the state machine by one stripped line, returning a frame when one completes"""
+        if not line:
+            return None
+
+        if is_separator(line):
+            if self.state == EXPECT_SEPARATOR:
+                self.state = EXPECT_VOLTAGE
+                self.frames += 1
+                return self._voltage, self._current
+            if self.state == EXPECT_CURRENT:
+                self.malformed += 1  # the current line never arrived
+            self.state = EXPECT_VOLTAGE
+            return None
+
+        if line.startswith(VOLTAGE_PREFIX):
+            if self.state in (EXPECT_CURRENT, EXPECT_SEPARATOR):
+                self.malformed += 1  # previous frame never finished, resync on this line
+            self._voltage = parse_field(line, VOLTAGE_PREFIX, b"V")
+            self.state = EXPECT_CURRENT if self._voltage is not None else self._malformed()
+        elif line.startswith(CURRENT_PREFIX):
+            if self.state == EXPECT_CURRENT:
+                self._current = parse_field(line, CURRENT_PREFIX, b"A")
+                self.state = EXPECT_SEPARATOR if self._current is not None else self._malformed()
+            elif self.state != RESYNC:
+                self._malformed()
+        elif line.startswith(CALIBRATION_PREFIX):
+            self.calibration_offset = parse_field(line, CALIBRATION_PREFIX, b"mV")
+            self.state = EXPECT_VOLTAGE
+        elif self.state in (EXPECT_CURRENT, EXPECT_SEPARATOR):
+            self._malformed()
+        return None
+
+    def _malformed(self):
+        self.malformed += 1
+        self.state = RESYNC
+        return RESYNC
@@ -0,0 +1,137 @@
+"""Incremental matplotlib line that is redrawn with blitting while data streams in."""
+import time
+
+import numpy as np
+
+
+class LivePlot:
+    """Persistent Line2D on an axes that only repaints itself between full redraws.
+
+    The axes background is cached after every full draw. New points are shown by
+    restoring that background, drawing the line and blitting the axes box; a full
+    canvas redraw only happens when the data leaves the current axis limits.
+    """
+
+    def __init__(self, canvas, ax, max_fps=20, headroom=0.25, **line_kwargs):
+        self.canvas = canvas
+        self.ax = ax
+        self.min_interval = 1.0 / max_fps
+        self.headroom = headroom
+        self.line, = ax.plot([], [], animated=True, **line_kwargs)
+        self.overlays = []  # extra animated artists (e.g. alarm markers) blitted with the line
+        self.background = None
+        self._last_draw = 0.0
+        self._count = 0
+        self._extent = None  # (xmin, xmax, ymin, ymax) of the points shown so far
+        self._cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """Cache the freshly drawn background and paint the line on top"""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        self.ax.draw_artist(self.line)
+        for overlay in self.overlays:
+            self.ax.draw_artist(overlay)
+
+    def add_overlay(self, **line_kwargs):
+        """Create an animated Line2D that is repainted along with the live line; the caller sets its data"""
+        overlay, = self.ax.plot([], [], animated=True, **line_kwargs)
+        self.overlays.append(overlay)
+        return overlay
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
+
+    def reset(self):
+        """Forget the shown points so the next update recomputes the limits"""
+        self._count = 0
+        self._extent = None
+        self.line.set_data([], [])
+
+    def update(self, x_data, y_data, force=False):
+        """Show x_data/y_data, which extend the previously shown points. Returns True if drawn."""
+        now = time.perf_counter()
+        if not force and now - self._last_draw < self.min_interval:
+            return False
+
+        n = min(len(x_data), len(y_data))
+        if n < self._count:
+            self.reset()
+        x = np.asarray(x_data[:n], dtype=float)
+        y = np.asarray(y_data[:n], dtype=float)
+
+        # Only the points added since the last frame can move the limits
+        limits_changed = self._grow_extent(x[self._count:], y[self._count:])
+        self._count = n
+        self.line.set_data(x, y)
+        self._last_draw = now
+
+        if limits_changed or self.background is None:
+            self.canvas.draw()  # full redraw, _on_draw recaptures the background
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+            self.canvas.blit(self.ax.bbox)
+        return True
+
+    def show_window(self, x_data, y_data, xlim, force=False):
+        """Show a series that replaces the previous one (e.g. a decimated time window) within fixed x limits.
+
+        The y limits fit the shown data with headroom and only move when the data
+        leaves them or shrinks to a small part of them. Returns True if drawn.
+        """
+        now = time.perf_counter()
+        if not force and now - self._last_draw < self.min_interval:
+            return False
+        self._count = 0  # a later update() starts over with the full series
+        self._extent = None
+        x = np.asarray(x_data, dtype=float)
+        y = np.asarray(y_data, dtype=float)
+        self.line.set_data(x, y)
+        self._last_draw = now
+
+        redraw = self.background is None
+        if tuple(self.ax.get_xlim()) != tuple(xlim):
+            self.ax.set_xlim(*xlim)
+            redraw = True
+        valid = y[~np.isnan(y)]
+        if len(valid):
+            lo, hi = valid.min(), valid.max()
+            ylo, yhi = self.ax.get_ylim()
+            if lo < ylo or hi > yhi or (hi - lo) < 0.25 * (yhi - ylo):
+                self.ax.set_ylim(*self._padded(lo, hi))
+                redraw = True
+
+        if redraw:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+            self.canvas.blit(self.ax.bbox)
+        return True
+
+    def _grow_extent(self, new_x, new_y):
+        """Merge the new points into the data extent, widening the axis limits with headroom if needed"""
+        valid = ~(np.isnan(new_x) | np.isnan(new_y))
+        if not valid.any():
+            return False
+        new_x, new_y = new_x[valid], new_y[valid]
+        lo_x, hi_x, lo_y, hi_y = new_x.min(), new_x.max(), new_y.min(), new_y.max()
+        if self._extent is not None:
+            ex = self._extent
+            lo_x, hi_x = min(lo_x, ex[0]), max(hi_x, ex[1])
+            lo_y, hi_y = min(lo_y, ex[2]), max(hi_y, ex[3])
+        self._extent = (lo_x, hi_x, lo_y, hi_y)
+
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        if self.background is not None and xlim[0] <= lo_x and hi_x <= xlim[1] and ylim[0] <= lo_y and hi_y <= ylim[1]:
+            return False
+        self.ax.set_xlim(*self._padded(lo_x, hi_x))
+        self.ax.set_ylim(*self._padded(lo_y, hi_y))
+        return True
+
+    def _padded(self, lo, hi):
+        margin = (hi - lo) * self.headroom if hi != lo else 0.1
+        return lo - margin, hi + margin
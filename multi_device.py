@@ -0,0 +1,179 @@
+"""Concurrent acquisition from several Arduinos, one per machine rig.
+
+Every port gets its own AcquisitionEngine, SampleStore and status, and runs on
+its own reader thread. The readers spend nearly all their time blocked in
+serial reads, which release the GIL, so throughput scales with the number of
+devices. merged_timeline() interleaves all devices by timestamp for
+cross-machine comparison.
+"""
+import concurrent.futures
+import re
+import time
+
+import numpy as np
+import serial
+
+from acquisition import AcquisitionEngine, open_transport, progress_text
+from sample_store import SAMPLE_DTYPE, SampleStore
+
+# Upper bound on reader threads, each device holds one for the whole run
+MAX_DEVICES = 16
+
+# Without an on_progress callback, progress becomes a status line at most this often per device
+PROGRESS_STATUS_INTERVAL = 1.0
+
+MERGED_DTYPE = np.dtype([("device", np.int16)] + SAMPLE_DTYPE.descr)
+
+
+class DeviceChannel:
+    """Acquisition state of a single device"""
+
+    def __init__(self, index, port):
+        self.index = index
+        self.port = port
+        self.store = SampleStore()
+        self.engine = None
+        self.status = "Status: Idle"
+        self.error = None
+        self.count = 0
+        self.progress_reported = None  # time.monotonic() of the last progress status line
+
+    @property
+    def name(self):
+        """Port name usable in file names"""
+        return re.sub(r"\W+", "_", self.port).strip("_") or f"device{self.index}"
+
+
+class MultiDeviceAcquisition:
+    """Runs one acquisition engine per port on a bounded pool of reader threads"""
+
+    def __init__(self, ports, readings=None, stabilize_time=0.0, baudrate=9600, settle_time=2.0,
+                 on_sample=None, on_status=None, on_progress=None, sink_factory=None, store_samples=True,
+                 detector_factory=None, on_alarm=None, connection_factory=None):
+        if not ports:
+            raise ValueError("At least one port is required")
+        if len(ports) > MAX_DEVICES:
+            raise ValueError(f"At most {MAX_DEVICES} devices are supported")
+        if len(set(ports)) != len(ports):
+            raise ValueError("Each port can only be used once")
+        self.channels = [DeviceChannel(i, port) for i, port in enumerate(ports)]
+        self.readings = readings
+        self.stabilize_time = stabilize_time
+        self.baudrate = baudrate
+        self.settle_time = settle_time
+        self.on_sample = on_sample  # called as on_sample(channel, sample) from the reader thread
+        self.on_status = on_status  # called as on_status(channel, text, color) from the reader thread
+        self.on_progress = on_progress  # called as on_progress(channel, count, total), defaults to a status line
+        self.store_samples = store_samples  # False when on_sample hands samples to another thread's store
+        self.sink_factory = sink_factory  # channel -> list of sinks for that device
+        self.detector_factory = detector_factory  # channel -> anomaly.AnomalyMonitor for that device
+        self.on_alarm = on_alarm  # called as on_alarm(channel, alarm) from the reader thread
+        # channel -> connection.ConnectionManager kept open by the caller; None opens and closes the port per run
+        self.connection_factory = connection_factory
+        self._executor = None
+        self._futures = []
+        self._stopping = False
+
+    def start(self):
+        """Start every device reader in the background"""
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.channels),
+                                                               thread_name_prefix="acquisition")
+        self._futures = [self._executor.submit(self._run_channel, channel) for channel in self.channels]
+        self._executor.shutdown(wait=False)
+
+    def join(self, timeout=None):
+        """Wait for all readers, returns the total number of readings"""
+        concurrent.futures.wait(self._futures, timeout=timeout)
+        return sum(channel.count for channel in self.channels)
+
+    def run(self):
+        """Start all readers and block until they finish"""
+        self.start()
+        return self.join()
+
+    def stop(self):
+        self._stopping = True
+        for channel in self.channels:
+            if channel.engine:
+                channel.engine.stop()
+
+    def _set_status(self, channel, text, color):
+        channel.status = text
+        if self.on_status:
+            self.on_status(channel, text, color)
+
+    def _progress(self, channel, count, total):
+        if self.on_progress:
+            channel.status = progress_text(count, total)
+            self.on_progress(channel, count, total)
+        else:
+            # on_progress runs for every reading, a status line each time would flood a console
+            now = time.monotonic()
+            if (count == 1 or count == total or channel.progress_reported is None
+                    or now - channel.progress_reported >= PROGRESS_STATUS_INTERVAL):
+                channel.progress_reported = now
+                self._set_status(channel, progress_text(count, total), "green")
+            else:
+                channel.status = progress_text(count, total)
+
+    def _run_channel(self, channel):
+        def on_sample(sample):
+            if self.store_samples:
+                channel.store.append(*sample)
+            if self.on_sample:
+                self.on_sample(channel, sample)
+
+        def on_alarm(alarm):
+            if self.on_alarm:
+                self.on_alarm(channel, alarm)
+
+        try:
+            connection = self.connection_factory(channel) if self.connection_factory else None
+            if connection is not None:
+                connection.arm()
+            else:
+                transport = open_transport(channel.port, baudrate=self.baudrate)
+            sinks = self.sink_factory(channel) if self.sink_factory else ()
+            detectors = self.detector_factory(channel) if self.detector_factory else None
+            options = dict(readings=self.readings, stabilize_time=self.stabilize_time,
+                           on_sample=on_sample, sinks=sinks,
+                           on_status=lambda text, color: self._set_status(channel, text, color),
+                           on_progress=lambda count, total: self._progress(channel, count, total),
+                           detectors=detectors, on_alarm=on_alarm)
+            if connection is not None:
+                channel.engine = connection.engine(**options)
+            else:
+                channel.engine = AcquisitionEngine(transport, settle_time=self.settle_time, **options)
+            if self._stopping:
+                channel.engine.stop()
+            channel.count = channel.engine.run()
+            self._set_status(channel, "Status: Experiment Complete!", "lime")
+        except serial.SerialException as e:
+            channel.error = e
+            self._set_status(channel, "Error: Serial connection failed.", "red")
+        except Exception as e:
+            channel.error = e
+            self._set_status(channel, f"Error: {str(e)}", "red")
+
+    def merged_timeline(self):
+        """All devices' samples in one structured array ordered by timestamp, with a device column"""
+        return merged_timeline([channel.store for channel in self.channels])
+
+
+def merged_timeline(stores):
+    """Interleave the samples of several stores by time_ns, tagging each with its store index"""
+    views = [store.view() for store in stores]
+    merged = np.empty(sum(len(samples) for samples in views), dtype=MERGED_DTYPE)
+    offset = 0
+    for index, samples in enumerate(views):
+        block = merged[offset:offset + len(samples)]
+        block["device"] = index
+        for name in SAMPLE_DTYPE.names:
+            block[name] = samples[name]
+        offset += len(samples)
+    # Each device's stream is already ordered, a stable sort keeps ties in device order
+    merged = merged[np.argsort(merged["time_ns"], kind="stable")]
+    if len(merged):
+        # Per-device elapsed times start at each device's first reading, rebase them on a shared origin
+        merged["elapsed"] = (merged["time_ns"] - merged["time_ns"][0]) / 1e9
+    return merged
@@ -0,0 +1,157 @@
+"""Acquisition in a separate process, for runs where the GUI must not delay serial reads.
+
+In the GUI process, redraws and big data table loads hold the GIL, and a
+reader thread that waits too long lets the OS serial buffer overflow at higher
+sample rates. AcquisitionProcess runs the AcquisitionEngine in a child process
+of its own instead:
+
+    samples   written by the child into a SharedSampleRing (shm_ring.py), read
+              by the GUI as zero-copy views, nothing pickled per sample
+    status    phase changes, alarms and the end of each run, as small tuples on
+              a multiprocessing queue
+    commands  one queue item per run; the child keeps its ConnectionManager, so
+              the port stays open and back-to-back runs still start at once
+
+The child also writes the session journal, so disk I/O happens outside the GUI
+process as well.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+
+import serial
+
+from acquisition import AcquisitionError
+from anomaly import AnomalyMonitor
+from connection import ConnectionManager
+from session_journal import JournalError, JournalWriter
+from shm_ring import RING_CAPACITY, SharedSampleRing
+from ui_events import ALARM, DONE, STATUS
+
+log = logging.getLogger(__name__)
+
+# Messages from the child are ui_events kinds without the source or store, which the GUI adds:
+#   (STATUS, text, color)   (ALARM, anomaly.Alarm)   (DONE, succeeded, journal path or None if it failed)
+
+# Seconds between checks of the stop flag while a run is in progress
+STOP_POLL_S = 0.1
+
+
+def _serve(ring_name, port, baudrate, settle_time, commands, messages, stop):
+    """Child process main loop: one command per run, None to exit"""
+    ring = SharedSampleRing.attach(ring_name)
+    connection = ConnectionManager(port, baudrate=baudrate, settle_time=settle_time)
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            _run(ring, connection, messages, stop, **command)
+    finally:
+        connection.close()
+        ring.close()
+
+
+def _run(ring, connection, messages, stop, readings, stabilize_time, detector_settings, journal_path):
+    def post_status(text, color):
+        messages.put((STATUS, text, color))
+
+    succeeded = False
+    finished = threading.Event()
+    try:
+        post_status("Status: Connecting...", "yellow")
+        connection.arm()
+        sinks = [JournalWriter(journal_path, metadata={"port": connection.port, "baudrate": connection.baudrate})]
+        engine = connection.engine(readings=readings, stabilize_time=stabilize_time,
+                                   on_sample=lambda sample: ring.append(*sample), on_status=post_status,
+                                   sinks=sinks,
+                                   detectors=AnomalyMonitor(detector_settings) if detector_settings else None,
+                                   on_alarm=lambda alarm: messages.put((ALARM, alarm)))
+
+        def watch_stop():
+            """Forward the parent's stop flag to the engine"""
+            while not finished.wait(STOP_POLL_S):
+                if stop.value:
+                    engine.stop()
+                    return
+
+        threading.Thread(target=watch_stop, name="stop-watch", daemon=True).start()
+        engine.run()
+        post_status("Status: Experiment Complete!", "lime")
+        succeeded = True
+    except JournalError as e:
+        post_status(f"Error: {e}", "red")
+        succeeded, journal_path = True, None  # the samples reached the GUI, only the journal is incomplete
+    except serial.SerialException:
+        post_status("Error: Serial connection failed.", "red")
+    except AcquisitionError as e:
+        post_status(f"Error: {e}", "red")
+    except Exception as e:
+        log.exception("Experiment failed")
+        post_status(f"Error: {str(e)}", "red")
+    finally:
+        finished.set()
+        messages.put((DONE, succeeded, journal_path))
+
+
+class AcquisitionProcess:
+    """Child process that keeps one port open and runs experiments on request"""
+
+    def __init__(self, port, baudrate=9600, settle_time=2.0, capacity=RING_CAPACITY):
+        self.port = port
+        self.baudrate = baudrate
+        # spawn: a forked child would inherit Tk's and matplotlib's state
+        context = multiprocessing.get_context("spawn")
+        self.ring = SharedSampleRing.create(capacity)
+        self._commands = context.Queue()
+        self._messages = context.Queue()
+        # A lock-free flag rather than an Event: setting an Event a killed child was waiting on can hang
+        self._stop = context.RawValue("b", 0)
+        self._process = context.Process(target=_serve, name=f"acquisition-{port}", daemon=True,
+                                        args=(self.ring.name, port, baudrate, settle_time,
+                                              self._commands, self._messages, self._stop))
+        self._process.start()
+        self.dropped = 0  # samples overwritten before the GUI read them
+
+    @property
+    def alive(self):
+        return self._process.is_alive()
+
+    def start_run(self, readings, stabilize_time, journal_path, detector_settings=None):
+        self._stop.value = 0
+        self._commands.put({"readings": readings, "stabilize_time": stabilize_time,
+                            "detector_settings": detector_settings, "journal_path": journal_path})
+
+    def stop(self):
+        """End the current run after its current reading"""
+        self._stop.value = 1
+
+    def poll(self):
+        """(messages, records) since the last poll; records is a zero-copy view, copy it before the next poll.
+
+        Messages are drained first: a DONE message is sent after the run's last
+        sample was published, so the records read afterwards include all of them.
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                break
+        records, dropped = self.ring.read()
+        if dropped:
+            self.dropped += dropped
+            log.warning("%d samples were overwritten before they were read", dropped)
+        return messages, records
+
+    def close(self, timeout=5.0):
+        """Stop any run, end the child and free the shared memory"""
+        self._stop.value = 1
+        if self._process.is_alive():
+            self._commands.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+        self.ring.close()
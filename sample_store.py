@@ -0,0 +1,91 @@
+"""Columnar in-memory storage for acquired samples."""
+import numpy as np
+
+# One record per reading: reading number, wall-clock timestamp in ns, seconds since the
+# first reading of the run, the measured values and the quantities derived from them by
+# analytics.StreamingAnalytics (power in W, cumulative energy in J, rolling power mean/std/min/max)
+SAMPLE_DTYPE = np.dtype([
+    ("reading", np.int64),
+    ("time_ns", np.int64),
+    ("elapsed", np.float64),
+    ("voltage", np.float32),
+    ("current", np.float32),
+    ("power", np.float32),
+    ("energy", np.float64),
+    ("power_mean", np.float32),
+    ("power_std", np.float32),
+    ("power_min", np.float32),
+    ("power_max", np.float32),
+])
+
+
+class SampleStore:
+    """Samples kept in a single NumPy structured array.
+
+    The array grows by doubling, so appends are amortized O(1) and views never
+    copy. The store only ever grows until clear(): the decimation pyramid and the
+    spectrum fold in new rows incrementally. Long runs are bounded by the session
+    journal, which is read back memory-mapped.
+    """
+
+    def __init__(self, capacity=1024, dtype=SAMPLE_DTYPE):
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(max(capacity, 1), dtype=self.dtype)
+        self._count = 0
+        self.version = 0  # bumped on every change so readers can cache derived data
+
+    def __len__(self):
+        return self._count
+
+    def append(self, *values):
+        """Append one record given its field values in dtype order"""
+        if self._count == len(self._data):
+            self._grow(self._count + 1)
+        self._data[self._count] = values
+        self._count += 1
+        self.version += 1
+
+    def extend(self, records):
+        """Append a structured array (or sequence of tuples) of records"""
+        records = np.asarray(records, dtype=self.dtype)
+        n = len(records)
+        if self._count + n > len(self._data):
+            self._grow(self._count + n)
+        self._data[self._count:self._count + n] = records
+        self._count += n
+        self.version += 1
+
+    def _grow(self, needed):
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        data = np.zeros(capacity, dtype=self.dtype)
+        data[:self._count] = self._data[:self._count]
+        self._data = data
+
+    def clear(self):
+        self._count = 0
+        self.version += 1
+
+    def view(self):
+        """Zero-copy structured view of the samples, oldest first"""
+        return self._data[:self._count]
+
+    def column(self, name):
+        """Zero-copy view of one column"""
+        return self.view()[name]
+
+    @property
+    def record_size(self):
+        """Bytes needed to hold one sample"""
+        return self.dtype.itemsize
+
+    @property
+    def nbytes(self):
+        """Bytes currently allocated by the store"""
+        return self._data.nbytes
+
+    @property
+    def bytes_per_sample(self):
+        """Allocated bytes divided by the stored samples, including growth slack"""
+        return self.nbytes / max(self._count, 1)
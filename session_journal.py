@@ -0,0 +1,232 @@
+"""Crash-safe, append-only on-disk journal of a session's samples.
+
+A journal is two files:
+
+    session.vij      4 KiB header (magic + JSON with the record dtype), then raw
+                     fixed-size sample records appended in chunks
+    session.vij.idx  one INDEX_DTYPE entry per chunk: first record, count,
+                     first/last timestamp and CRC32 of the chunk bytes
+
+Samples are collected into a NumPy chunk on the acquisition thread and handed
+to a background writer thread, which appends each chunk with a single write
+followed by its index entry. A chunk is handed over when it is full or when its
+oldest sample is older than flush_interval, so a kill -9 loses at most the chunk
+that was still being filled. A failed write (e.g. a full disk) stops the writer
+and is raised by close() as a JournalError. The records region is read back with np.memmap,
+so opening a journal never loads the samples themselves.
+"""
+import bisect
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from sample_store import SAMPLE_DTYPE
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"VIJRNL01"
+HEADER_SIZE = 4096
+JOURNAL_EXTENSION = ".vij"
+INDEX_SUFFIX = ".idx"
+
+INDEX_DTYPE = np.dtype([
+    ("first_record", np.int64),
+    ("count", np.int64),
+    ("first_time_ns", np.int64),
+    ("last_time_ns", np.int64),
+    ("crc32", np.uint32),
+    ("reserved", np.uint32),
+])
+
+
+class JournalError(Exception):
+    """Raised when a file is not a readable session journal"""
+
+
+def _encode_header(dtype, chunk_records, metadata):
+    header = json.dumps({
+        "dtype": dtype.descr,
+        "chunk_records": chunk_records,
+        "created_ns": time.time_ns(),
+        "metadata": metadata or {},
+    }).encode("utf-8")
+    if len(MAGIC) + 4 + len(header) > HEADER_SIZE:
+        raise JournalError("Journal metadata is too large for the header")
+    blob = MAGIC + len(header).to_bytes(4, "little") + header
+    return blob.ljust(HEADER_SIZE, b"\0")
+
+
+def _decode_header(blob):
+    if len(blob) < HEADER_SIZE or not blob.startswith(MAGIC):
+        raise JournalError("Not a session journal")
+    length = int.from_bytes(blob[len(MAGIC):len(MAGIC) + 4], "little")
+    header = json.loads(blob[len(MAGIC) + 4:len(MAGIC) + 4 + length].decode("utf-8"))
+    header["dtype"] = np.dtype([tuple(field) for field in header["dtype"]])
+    return header
+
+
+class JournalWriter:
+    """Sink that streams samples to a journal; disk writes happen on a background thread"""
+
+    def __init__(self, path, dtype=SAMPLE_DTYPE, chunk_records=1024, flush_interval=1.0, fsync=False,
+                 metadata=None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.records_written = 0  # records handed to the writer thread
+        self.error = None  # first exception raised by the writer thread
+
+        with open(path, "wb") as f:
+            f.write(_encode_header(self.dtype, chunk_records, metadata))
+        self._data_fd = os.open(path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        self._index_fd = os.open(path + INDEX_SUFFIX,
+                                 os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        self._chunk = np.empty(chunk_records, dtype=self.dtype)
+        self._fill = 0
+        self._chunk_started = 0.0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer_loop, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, sample):
+        """Add one sample (a tuple in dtype field order)"""
+        if self._fill == 0:
+            self._chunk_started = time.monotonic()
+        self._chunk[self._fill] = tuple(sample)
+        self._fill += 1
+        if self._fill == self.chunk_records or time.monotonic() - self._chunk_started >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Hand the current (possibly partial) chunk to the writer thread"""
+        if self._fill == 0:
+            return
+        self._queue.put((self.records_written, self._chunk[:self._fill]))
+        self.records_written += self._fill
+        self._chunk = np.empty(self.chunk_records, dtype=self.dtype)
+        self._fill = 0
+
+    def close(self):
+        """Flush the remaining samples and wait for the writer thread; raises JournalError if a write failed"""
+        if self._thread is None:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        os.close(self._data_fd)
+        os.close(self._index_fd)
+        if self.error is not None:
+            raise JournalError(f"Could not write session journal {self.path}: {self.error}") from self.error
+
+    def _writer_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue
+            first_record, chunk = item
+            try:
+                payload = chunk.tobytes()
+                os.write(self._data_fd, payload)
+                if self.fsync:
+                    os.fsync(self._data_fd)
+                entry = np.array([(first_record, len(chunk), chunk["time_ns"][0], chunk["time_ns"][-1],
+                                   zlib.crc32(payload), 0)], dtype=INDEX_DTYPE)
+                os.write(self._index_fd, entry.tobytes())
+                if self.fsync:
+                    os.fsync(self._index_fd)
+            except OSError as e:
+                log.error("Writing session journal %s failed, later samples are not saved: %s", self.path, e)
+                self.error = e
+
+
+class JournalReader:
+    """Memory-mapped, read-only view of a journal with the same read interface as SampleStore"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = _decode_header(f.read(HEADER_SIZE))
+        self.dtype = header["dtype"]
+        self.chunk_records = header["chunk_records"]
+        self.created_ns = header["created_ns"]
+        self.metadata = header["metadata"]
+        self.version = 0  # a journal never changes once opened
+
+        # Complete records only, a torn write at the tail is ignored
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count > 0:
+            self._records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self._records = np.empty(0, dtype=self.dtype)
+
+        index_path = path + INDEX_SUFFIX
+        if os.path.exists(index_path):
+            entries = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+            self.index = np.fromfile(index_path, dtype=INDEX_DTYPE, count=entries)
+        else:
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self._records)
+
+    def view(self):
+        """Zero-copy structured view of all records (pages are read lazily by the OS)"""
+        return self._records
+
+    def column(self, name):
+        return self._records[name]
+
+    @property
+    def record_size(self):
+        return self.dtype.itemsize
+
+    def time_slice(self, start_ns, end_ns):
+        """Slice of records with start_ns <= time_ns < end_ns, found by binary search"""
+        # bisect reads O(log n) records, np.searchsorted would copy the whole strided column first
+        times = self._records["time_ns"]
+        return slice(bisect.bisect_left(times, start_ns), bisect.bisect_left(times, end_ns))
+
+    def verify(self):
+        """Return the index entries whose chunk is missing or fails its CRC check"""
+        bad = []
+        raw = self._records.view(np.uint8) if len(self._records) else np.empty(0, np.uint8)
+        size = self.dtype.itemsize
+        for entry in self.index:
+            start = int(entry["first_record"]) * size
+            chunk = raw[start:start + int(entry["count"]) * size]
+            if len(chunk) != int(entry["count"]) * size or zlib.crc32(chunk) != int(entry["crc32"]):
+                bad.append(entry)
+        return bad
+
+    def close(self):
+        """Drop the mapping; it is unmapped once no views of it remain"""
+        self._records = np.empty(0, dtype=self.dtype)
+
+
+def new_journal_path(directory, prefix="session"):
+    """Timestamped journal path inside directory, creating the directory if needed.
+
+    The file is created empty to reserve the name, so two sessions started in
+    the same second get _2, _3 ... suffixes instead of overwriting each other.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, time.strftime(f"{prefix}_%Y%m%d_%H%M%S"))
+    path, attempt = stem + JOURNAL_EXTENSION, 1
+    while True:
+        try:
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+            return path
+        except FileExistsError:
+            attempt += 1
+            path = f"{stem}_{attempt}{JOURNAL_EXTENSION}"
@@ -0,0 +1,154 @@
+"""Browsing and replaying recorded session journals.
+
+SessionView exposes a time range of a memory-mapped journal through the same
+read interface as SampleStore, so the graph and the data table show old runs
+without loading them. Only the records inside the range are ever touched.
+Graphs over time or reading number go through the same min/max pyramid as a
+live run (Gui_App.render_series), so short peaks stay visible at any zoom;
+other axis pairs use columns strided down to a bounded number of points.
+
+SessionReplayer plays records back through the normal acquisition callbacks
+(on_sample, on_progress, the anomaly detectors), in real time or faster. Like a
+live run, the replayed readings are numbered from 1, whatever range of the
+recording they came from.
+"""
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+
+from acquisition import Sample
+from diagnostics import ALARMS, METRICS
+
+log = logging.getLogger(__name__)
+
+# Upper bound on the points handed to the graph for one column
+MAX_PLOT_POINTS = 200_000
+
+# Records copied out of the memory map at a time while replaying
+REPLAY_CHUNK = 1024
+
+
+class SessionView:
+    """Read-only window [start_s, end_s) of a JournalReader with the SampleStore read interface.
+
+    view() is the full-resolution range, e.g. for the virtualized data table and
+    the min/max rendering. column() is strided so at most max_points values reach
+    a graph that cannot be decimated, such as voltage over current.
+    """
+
+    def __init__(self, reader, start_s=None, end_s=None, max_points=MAX_PLOT_POINTS):
+        self.reader = reader
+        self.dtype = reader.dtype
+        self.version = 0  # a recorded session never changes
+        self.start_s = start_s
+        self.end_s = end_s
+        records = reader.view()
+        if len(records) and (start_s is not None or end_s is not None):
+            origin = int(records[0]["time_ns"])
+            start_ns = origin + int((start_s or 0.0) * 1e9)
+            end_ns = origin + int(end_s * 1e9) if end_s is not None else int(records[-1]["time_ns"]) + 1
+            records = records[reader.time_slice(start_ns, end_ns)]
+        self._records = records
+        self.stride = max(math.ceil(len(records) / max_points), 1) if max_points else 1
+
+    def __len__(self):
+        return len(self._records)
+
+    def view(self):
+        """Zero-copy memmap slice of the range at full resolution"""
+        return self._records
+
+    def column(self, name):
+        """One column of the range, strided to at most max_points values"""
+        return self._records[name][::self.stride]
+
+    @property
+    def record_size(self):
+        return self.dtype.itemsize
+
+    @property
+    def bytes_per_sample(self):
+        """On-disk bytes per sample; nothing is held in memory"""
+        return self.dtype.itemsize
+
+    @property
+    def duration_s(self):
+        if len(self._records) < 2:
+            return 0.0
+        return (int(self._records[-1]["time_ns"]) - int(self._records[0]["time_ns"])) / 1e9
+
+
+READING_FIELD = Sample._fields.index("reading")
+
+
+def _sample_fields(dtype):
+    """Sample field -> record field name, or None for fields an older journal does not have"""
+    return [name if name in dtype.names else None for name in Sample._fields]
+
+
+class SessionReplayer:
+    """Feeds recorded samples to the acquisition callbacks at `speed` times the recorded rate"""
+
+    def __init__(self, records, speed=1.0, on_sample=None, on_status=None, on_progress=None,
+                 detectors=None, on_alarm=None):
+        self.records = records
+        self.speed = speed  # None or <= 0 replays as fast as possible
+        self.on_sample = on_sample
+        self.on_status = on_status
+        self.on_progress = on_progress
+        self.detectors = detectors
+        self.on_alarm = on_alarm
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def run(self):
+        """Replay on the calling thread; returns the number of samples replayed"""
+        total = len(self.records)
+        if self.on_status:
+            rate = f"{self.speed:g}x" if self.speed and self.speed > 0 else "full speed"
+            self.on_status(f"Status: Replaying {total} readings at {rate}...", "cyan")
+        if not total:
+            return 0
+
+        fields = _sample_fields(self.records.dtype)
+        origin_ns = int(self.records[0]["time_ns"])
+        started = time.monotonic()
+        count = 0
+        for begin in range(0, total, REPLAY_CHUNK):
+            # Copy one chunk out of the memory map, only these pages are read
+            chunk = np.array(self.records[begin:begin + REPLAY_CHUNK])
+            columns = [chunk[name].tolist() if name else [math.nan] * len(chunk) for name in fields]
+            # Row i of the replay's store is reading i + 1, which is where alarm markers are placed
+            columns[READING_FIELD] = range(begin + 1, begin + len(chunk) + 1)
+            for values in zip(*columns):
+                sample = Sample(*values)
+                if self.speed and self.speed > 0:
+                    ahead = (sample.time_ns - origin_ns) / 1e9 / self.speed - (time.monotonic() - started)
+                    if ahead > 0 and self._stop.wait(ahead):
+                        return count
+                if self._stop.is_set():
+                    return count
+                count += 1
+                if self.on_progress:
+                    self.on_progress(count, total)
+                self._emit(sample)
+        log.info("Replayed %d readings", count)
+        return count
+
+    def _emit(self, sample):
+        if self.on_sample:
+            self.on_sample(sample)
+        if self.detectors is not None:
+            for alarm in self.detectors.update(sample):
+                METRICS.count(ALARMS)
+                if self.on_alarm:
+                    self.on_alarm(alarm)
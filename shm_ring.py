@@ -0,0 +1,132 @@
+"""Single-producer single-consumer sample ring in shared memory.
+
+SharedSampleRing puts sample records in a multiprocessing.shared_memory
+block, so an acquisition process can hand samples to the GUI process without
+pickling anything. The block starts with a small header of uint64 counters
+followed by the records:
+
+    write index   records published so far, written only by the producer
+    read index    records consumed so far, written only by the consumer
+    capacity      slots in the ring
+    record size   dtype.itemsize, checked when attaching
+
+The indices only ever grow and each has a single writer, so no lock is
+needed. The producer stores a record first and then bumps the write index (an
+aligned 8-byte store, atomic and ordered after the record on x86-64); the
+consumer reads the write index first and then the records below it.
+
+Like SampleStore's ring mode the ring is mirrored: record i is written to slot
+i % capacity and to slot i % capacity + capacity, so any run of up to capacity
+consecutive records is one contiguous slice and read() returns it as a
+zero-copy NumPy view. The producer never waits: when the consumer falls more
+than capacity records behind, the oldest unread records are overwritten and
+reported as dropped by the next read().
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sample_store import SAMPLE_DTYPE
+
+# Header layout, uint64 slots
+WRITE_INDEX = 0
+READ_INDEX = 1
+CAPACITY = 2
+RECORD_SIZE = 3
+HEADER_BYTES = 64  # one cache line, so the records start aligned
+
+# Default ring size in samples, about 7 MB with the standard sample dtype
+RING_CAPACITY = 1 << 16
+
+
+class SharedSampleRing:
+    """Mirrored ring of sample records in shared memory; create() in one process, attach() in the other"""
+
+    def __init__(self, shm, dtype, owner):
+        self.shm = shm
+        self.dtype = np.dtype(dtype)
+        self.owner = owner  # the creating process unlinks the block
+        self._header = np.ndarray((HEADER_BYTES // 8,), dtype=np.uint64, buffer=shm.buf)
+        self.capacity = int(self._header[CAPACITY])
+        if int(self._header[RECORD_SIZE]) != self.dtype.itemsize:
+            raise ValueError(f"Ring records are {int(self._header[RECORD_SIZE])} bytes, "
+                             f"dtype has {self.dtype.itemsize}")
+        self._records = np.ndarray((2 * self.capacity,), dtype=self.dtype, buffer=shm.buf, offset=HEADER_BYTES)
+        # Local copies of our own index, the shared one is only ever written
+        self._write = int(self._header[WRITE_INDEX])
+        self._read = int(self._header[READ_INDEX])
+
+    @classmethod
+    def create(cls, capacity=RING_CAPACITY, dtype=SAMPLE_DTYPE):
+        dtype = np.dtype(dtype)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + 2 * capacity * dtype.itemsize)
+        header = np.ndarray((HEADER_BYTES // 8,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[CAPACITY] = capacity
+        header[RECORD_SIZE] = dtype.itemsize
+        del header  # no exported buffers may outlive close()
+        return cls(shm, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name, dtype=SAMPLE_DTYPE):
+        return cls(shared_memory.SharedMemory(name=name), dtype, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_index(self):
+        return int(self._header[WRITE_INDEX])
+
+    @property
+    def read_index(self):
+        return int(self._header[READ_INDEX])
+
+    # --- Producer side ---
+    def append(self, *values):
+        """Publish one record given its field values in dtype order"""
+        pos = self._write % self.capacity
+        self._records[pos] = values
+        self._records[pos + self.capacity] = values
+        self._write += 1
+        self._header[WRITE_INDEX] = self._write
+
+    def extend(self, records):
+        """Publish a structured array (or sequence of tuples) of records"""
+        records = np.asarray(records, dtype=self.dtype)
+        n = len(records)
+        cap = self.capacity
+        records = records[-cap:]  # only the newest capacity records can be kept
+        pos = (self._write + n - len(records)) % cap
+        first = min(len(records), cap - pos)  # up to the end of the lower half, the rest wraps to slot 0
+        for offset in (0, cap):
+            self._records[offset + pos:offset + pos + first] = records[:first]
+            self._records[offset:offset + len(records) - first] = records[first:]
+        self._write += n
+        self._header[WRITE_INDEX] = self._write
+
+    # --- Consumer side ---
+    def read(self, limit=None):
+        """(records, dropped): zero-copy view of the unread records, oldest first, and how many were lost.
+
+        The view is only guaranteed intact until the producer writes another
+        capacity - len(records) records, so copy it out (e.g. SampleStore.extend)
+        right away.
+        """
+        write = int(self._header[WRITE_INDEX])
+        start = max(self._read, write - self.capacity)  # anything older has been overwritten
+        dropped = start - self._read
+        stop = write if limit is None else min(write, start + limit)
+        pos = start % self.capacity
+        records = self._records[pos:pos + stop - start]
+        self._read = stop
+        self._header[READ_INDEX] = stop
+        return records, dropped
+
+    def close(self):
+        """Release this process's mapping; views returned by read() must be gone by now"""
+        self._header = self._records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
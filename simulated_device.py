@@ -0,0 +1,244 @@
+"""Fake Arduino that speaks the Dc_Voltage_Current_Measurement.ino protocol.
+
+SimulatedDevice streams the sketch's exact output into a pseudo-terminal: the
+banner, the calibration line and then voltage / current / separator triplets,
+with optional Gaussian noise and corrupted lines. The pty slave behaves like
+the Arduino's serial port: opening it resets the simulated board, which boots,
+prints its banner and streams until the port is closed again. The acquisition
+engine, the GUI and the command line tool can all be pointed at it:
+
+    python -m simulated_device --rate 20 --link /tmp/vi-device
+    python -m acquisition --port /tmp/vi-device --readings 100
+
+With a link path the device can also be unplugged and plugged back in, which
+recreates the pty behind the same name, as a USB cable pulled and reconnected
+would. Linux and macOS only (pty).
+
+frame_bytes() and SimulatedDevice.generate() build the same byte stream without
+a pty, e.g. to write into a pyserial loop:// port.
+"""
+import argparse
+import os
+import random
+import select
+import sys
+import threading
+import time
+
+BANNER = b"Voltage & Current Measurement\r\n-----------------------------------\r\n"
+SEPARATOR = b"-----------------------------\r\n"
+
+# Frames written per chunk when streaming as fast as possible
+FULL_SPEED_BATCH = 256
+
+# How often the device looks for the port being opened or closed
+POLL_INTERVAL = 0.01
+
+
+def banner_bytes(offset_mv=2500.0):
+    """Start-up output of the sketch, up to and including the blank line after calibration"""
+    return BANNER + b"Calibrated Current Sensor Offset: %.2f mV\r\n\r\n" % offset_mv
+
+
+def frame_bytes(voltage, current):
+    """One reading as the sketch prints it (Serial.print(x, 2) / (x, 3) and println)"""
+    return b"Input Voltage: %.2f V\r\nCurrent: %.3f A\r\n" % (voltage, current) + SEPARATOR
+
+
+def corrupt(line, rng):
+    """Damage one line the way a noisy link does: dropped, cut short or with flipped bytes"""
+    kind = rng.randrange(3)
+    if kind == 0:
+        return b""
+    if kind == 1:
+        return line[:rng.randrange(len(line))]
+    data = bytearray(line)
+    for _ in range(rng.randint(1, 3)):
+        data[rng.randrange(len(data))] = rng.randrange(256)
+    return bytes(data)
+
+
+class SimulatedDevice:
+    """Streams sketch output at `rate` frames per second into a pty, see the module docstring"""
+
+    def __init__(self, rate=1.0, voltage=12.0, current=0.5, noise=0.0, corruption=0.0,
+                 offset_mv=2500.0, boot_time=0.1, readings=None, link=None, seed=None):
+        self.rate = rate  # frames per second, None or <= 0 streams as fast as the reader takes them
+        self.voltage = voltage
+        self.current = current
+        self.noise = noise  # standard deviation, as a fraction of the nominal values
+        self.corruption = corruption  # probability that a line is damaged
+        self.offset_mv = offset_mv
+        self.boot_time = boot_time  # silence between opening the port and the banner, like the bootloader
+        self.readings = readings  # None streams until stopped
+        self.link = link  # stable path that follows the pty across unplug()/plug()
+        self.rng = random.Random(seed)
+        self.frames_sent = 0
+        self.frames_dropped = 0  # frames the pty had no room for because nobody was reading
+        self.resets = 0  # times the port was opened
+        self.on_write = None  # on_write(first, frames) after readings first..first+frames-1 were written
+        self._master = None
+        self._slave_name = None
+        self._poll = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def path(self):
+        """Port name to open: the link if there is one, else the pty slave"""
+        return self.link or self._slave_name
+
+    @property
+    def plugged(self):
+        return self._master is not None
+
+    def generate(self, frames):
+        """Bytes of the next `frames` readings, with noise and corruption applied"""
+        rng = self.rng
+        chunks = []
+        for _ in range(frames):
+            voltage, current = self.voltage, self.current
+            if self.noise:
+                voltage += rng.gauss(0.0, self.noise * abs(self.voltage))
+                current += rng.gauss(0.0, self.noise * abs(self.current))
+            frame = frame_bytes(voltage, current)
+            if self.corruption and rng.random() < self.corruption * 3:  # three lines per frame
+                lines = frame.split(b"\n")[:-1]
+                victim = rng.randrange(len(lines))
+                lines[victim] = corrupt(lines[victim] + b"\n", rng)
+                frame = b"".join(line if line.endswith(b"\n") else line + b"\n" for line in lines)
+            chunks.append(frame)
+        return b"".join(chunks)
+
+    # --- pty lifecycle ---
+    def start(self):
+        """Create the pty, returns the port path; the board starts when the port is opened"""
+        self.plug()
+        return self.path
+
+    def plug(self):
+        """Connect a fresh pty, behind the same link if there is one"""
+        import tty
+
+        if self.plugged:
+            return
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self._slave_name = os.ttyname(slave)
+        os.close(slave)  # the master reports a hang-up whenever no reader has the port open
+        os.set_blocking(self._master, False)
+        self._poll = select.poll()
+        self._poll.register(self._master, select.POLLOUT | select.POLLHUP)
+        if self.link:
+            if os.path.lexists(self.link):
+                os.remove(self.link)
+            os.symlink(self._slave_name, self.link)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="simulated-device", daemon=True)
+        self._thread.start()
+
+    def unplug(self):
+        """Close the pty; an open port on it starts failing like a disconnected USB device"""
+        if not self.plugged:
+            return
+        self._stop.set()
+        self._thread.join()
+        if self.link and os.path.lexists(self.link):
+            os.remove(self.link)
+        os.close(self._master)
+        self._master = self._slave_name = self._poll = None
+
+    def stop(self):
+        self.unplug()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _port_open(self):
+        return not any(events & select.POLLHUP for _, events in self._poll.poll(0))
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._port_open():
+                self.resets += 1
+                self._session()
+            else:
+                self._stop.wait(POLL_INTERVAL)
+
+    def _session(self):
+        """From a reset until the port is closed: boot, banner, readings"""
+        if self._stop.wait(self.boot_time) or not self._port_open():
+            return
+        self._write(banner_bytes(self.offset_mv))
+        started = time.monotonic()
+        sent = 0
+        while not self._stop.is_set() and self._port_open():
+            if self.readings is not None and self.frames_sent >= self.readings:
+                self._stop.wait(POLL_INTERVAL)
+                continue
+            if self.rate and self.rate > 0:
+                # Catch up on every frame that is due, then sleep until the next one
+                frames = int((time.monotonic() - started) * self.rate) + 1 - sent
+            else:
+                frames = FULL_SPEED_BATCH
+            if self.readings is not None:
+                frames = min(frames, self.readings - self.frames_sent)
+            if frames > 0:
+                if self._write(self.generate(frames)):
+                    self.frames_sent += frames
+                    if self.on_write:
+                        self.on_write(self.frames_sent - frames, frames)
+                else:
+                    self.frames_dropped += frames
+                sent += frames
+            if self.rate and self.rate > 0:
+                self._stop.wait(min(max(started + sent / self.rate - time.monotonic(), 0.0), 0.1))
+
+    def _write(self, data):
+        """Write everything or give up after a short wait for room, as a serial FIFO overflows"""
+        view = memoryview(data)
+        while view:
+            if self._stop.is_set() or not self._port_open():
+                return False
+            _, writable, _ = select.select([], [self._master], [], 0.2)
+            if not writable:
+                return False
+            try:
+                written = os.write(self._master, view)
+            except BlockingIOError:
+                continue
+            view = view[written:]
+        return True
+
+
+# --- Command line entry point ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Arduino streaming the V/I protocol into a pty")
+    parser.add_argument("--rate", type=float, default=1.0, help="Readings per second (0: as fast as possible)")
+    parser.add_argument("--voltage", type=float, default=12.0)
+    parser.add_argument("--current", type=float, default=0.5)
+    parser.add_argument("--noise", type=float, default=0.01, help="Noise standard deviation, fraction of the value")
+    parser.add_argument("--corruption", type=float, default=0.0, help="Probability that a line is damaged")
+    parser.add_argument("--boot-time", type=float, default=2.0, help="Delay between opening the port and the banner")
+    parser.add_argument("--link", help="Stable path for the port, e.g. /tmp/vi-device")
+    args = parser.parse_args(argv)
+
+    device = SimulatedDevice(rate=args.rate, voltage=args.voltage, current=args.current, noise=args.noise,
+                             corruption=args.corruption, boot_time=args.boot_time, link=args.link)
+    print(f"Simulated device on {device.start()}, Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
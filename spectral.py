@@ -0,0 +1,196 @@
+"""Windowed spectral analysis of the sample streams.
+
+Spectra are Welch estimates. A signal is cut into overlapping segments with
+np.lib.stride_tricks.sliding_window_view (a view, nothing is copied), each
+segment is detrended, windowed and transformed in one batched rfft, and the
+power spectra are averaged. IncrementalWelch keeps the running sum of segment
+spectra, so every update only transforms the segments completed by the newly
+arrived samples instead of the whole history. Long inputs, such as the first
+update on a memory-mapped session, are fed in blocks of UPDATE_BLOCK samples, so
+only one block's segments are in memory at a time. The last segment spectra are
+also kept in a fixed-size ring for a spectrogram.
+
+The sampling rate is estimated from the sample timestamps. With the stock
+firmware, which prints one averaged reading every few seconds, that puts the
+Nyquist frequency well below 1 Hz. The spectra then show slow load and supply
+oscillations rather than mains harmonics. A firmware that streams raw ADC
+samples gets the full analysis unchanged.
+"""
+import collections
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Harmonics reported besides the fundamental
+HARMONIC_COUNT = 10
+
+# Samples transformed per step of IncrementalWelch.update
+UPDATE_BLOCK = 1 << 16
+
+# Summary of one spectrum; harmonics[k] is the amplitude at (k + 1) * fundamental
+SpectrumReport = collections.namedtuple("SpectrumReport", ["sample_rate", "fundamental", "thd", "harmonics",
+                                                           "segments"])
+
+
+def segment_spectra(values, segment, step, window):
+    """Power spectrum of every complete segment of values, one row per segment"""
+    if len(values) < segment:
+        return np.empty((0, segment // 2 + 1))
+    segments = sliding_window_view(np.asarray(values, dtype=float), segment)[::step]
+    segments = segments - segments.mean(axis=1, keepdims=True)  # the DC level would swamp the spectrum
+    spectra = np.abs(np.fft.rfft(segments * window, axis=1)) ** 2
+    return spectra
+
+
+def welch(values, sample_rate, segment=256, overlap=0.5):
+    """Welch power spectral density of values; returns (freqs, psd), both empty if values is too short"""
+    window = np.hanning(segment)
+    step = max(int(segment * (1 - overlap)), 1)
+    spectra = segment_spectra(values, segment, step, window)
+    freqs = np.fft.rfftfreq(segment, d=1.0 / sample_rate)
+    if not len(spectra):
+        return freqs[:0], np.empty(0)
+    return freqs, _density(spectra.mean(axis=0), window, sample_rate)
+
+
+def _density(power, window, sample_rate):
+    """Scale averaged |rfft|^2 to a one-sided power spectral density"""
+    psd = power / (sample_rate * np.sum(window ** 2))
+    psd[1:-1] *= 2
+    return psd
+
+
+def harmonic_report(freqs, psd, sample_rate, segments=0, count=HARMONIC_COUNT):
+    """Fundamental (strongest non-DC bin), THD and amplitudes of its harmonics below Nyquist"""
+    if len(psd) < 3:
+        return SpectrumReport(sample_rate, None, None, np.empty(0), segments)
+    amplitude = np.sqrt(psd)
+    fundamental_bin = int(np.argmax(amplitude[1:])) + 1
+    bins = fundamental_bin * np.arange(1, count + 2)
+    bins = bins[bins < len(amplitude)]
+    # Take the peak within one bin of each harmonic, the true frequency rarely falls on a bin centre,
+    # unless the fundamental is so low that the neighbouring bins belong to the next harmonic
+    reach = 1 if fundamental_bin >= 3 else 0
+    neighbours = np.clip(bins[:, None] + np.arange(-reach, reach + 1), 1, len(amplitude) - 1)
+    harmonics = amplitude[neighbours].max(axis=1)
+    fundamental = harmonics[0]
+    thd = float(np.sqrt(np.sum(harmonics[1:] ** 2)) / fundamental) if fundamental > 0 else None
+    return SpectrumReport(sample_rate, float(freqs[fundamental_bin]), thd, harmonics, segments)
+
+
+class IncrementalWelch:
+    """Welch estimate that grows block by block, transforming only the newly completed segments"""
+
+    def __init__(self, segment=256, overlap=0.5, history=128):
+        self.segment = segment
+        self.step = max(int(segment * (1 - overlap)), 1)
+        self.window = np.hanning(segment)
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self._tail = np.empty(0)  # samples not yet covered by a complete segment start
+        self._power_sum = np.zeros(self.segment // 2 + 1)
+        self.segments = 0
+        self._spectrogram = np.zeros((self.history, self.segment // 2 + 1))
+        self._next_column = 0
+
+    def update(self, values):
+        """Fold in newly arrived values, returns the number of segments they completed"""
+        return sum(self._update_block(values[begin:begin + UPDATE_BLOCK])
+                   for begin in range(0, len(values), UPDATE_BLOCK))
+
+    def _update_block(self, values):
+        data = np.concatenate([self._tail, np.asarray(values, dtype=float)])
+        spectra = segment_spectra(data, self.segment, self.step, self.window)
+        n = len(spectra)
+        if n:
+            self._power_sum += spectra.sum(axis=0)
+            self.segments += n
+            for row in spectra[-self.history:]:
+                self._spectrogram[self._next_column % self.history] = row
+                self._next_column += 1
+        # The next segment starts n steps in; keep everything from there on
+        self._tail = data[n * self.step:]
+        return n
+
+    def psd(self, sample_rate):
+        """(freqs, psd) averaged over every segment seen so far"""
+        freqs = np.fft.rfftfreq(self.segment, d=1.0 / sample_rate)
+        if not self.segments:
+            return freqs[:0], np.empty(0)
+        return freqs, _density(self._power_sum / self.segments, self.window, sample_rate)
+
+    def spectrogram(self, sample_rate):
+        """Density of the newest segments, oldest row first, shape (segments, freqs)"""
+        rows = min(self._next_column, self.history)
+        order = np.arange(self._next_column - rows, self._next_column) % self.history
+        return _density(self._spectrogram[order].T, self.window, sample_rate).T if rows else np.empty((0, 0))
+
+
+class SpectralAnalyzer:
+    """Keeps an IncrementalWelch in step with one column of a growing sample store"""
+
+    def __init__(self, field="voltage", segment=64, overlap=0.5, history=128):
+        self.field = field
+        self.welch = IncrementalWelch(segment, overlap, history)
+        self._store = None
+        self._consumed = 0  # len(store) at the last update
+        self._analyzed = 0  # rows fed to the estimator
+        self._first_ns = None
+        self._last_ns = None
+
+    def reset(self):
+        self.welch.reset()
+        self._store = None
+        self._consumed = 0
+        self._analyzed = 0
+        self._first_ns = None
+        self._last_ns = None
+
+    def backlog(self, store):
+        """Rows of store the next update() would analyze"""
+        total = len(store)
+        if store is not self._store or total < self._consumed:
+            return total
+        return total - self._consumed
+
+    def update(self, store):
+        """Analyze the rows appended to store since the last call (everything, for a new store)"""
+        total = len(store)
+        if store is not self._store or total < self._consumed:
+            # A new store, or this one was cleared
+            self.reset()
+            self._store = store
+        records = store.view()[self._consumed:total]
+        if not len(records) or self.field not in records.dtype.names:
+            return 0
+        self._consumed = total
+        self._analyzed += len(records)
+        times = records["time_ns"]
+        if self._first_ns is None:
+            self._first_ns = int(times[0])
+        self._last_ns = int(times[-1])
+        return self.welch.update(records[self.field])
+
+    @property
+    def sample_rate(self):
+        """Mean rate over everything analyzed so far"""
+        if self._first_ns is None or self._last_ns == self._first_ns:
+            return None
+        return (self._analyzed - 1) * 1e9 / (self._last_ns - self._first_ns)
+
+    def spectrum(self):
+        """(freqs, psd, report), or None until one full segment is available"""
+        rate = self.sample_rate
+        if rate is None or not self.welch.segments:
+            return None
+        freqs, psd = self.welch.psd(rate)
+        return freqs, psd, harmonic_report(freqs, psd, rate, self.welch.segments)
+
+    def spectrogram(self):
+        """(freqs, spectrogram rows) for the newest segments, or None"""
+        rate = self.sample_rate
+        if rate is None or not self.welch.segments:
+            return None
+        return np.fft.rfftfreq(self.welch.segment, d=1.0 / rate), self.welch.spectrogram(rate)
@@ -0,0 +1,35 @@
+"""python -m acquisition, run the way users run it"""
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+from simulated_device import SimulatedDevice
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, "-m", "acquisition", *args], cwd=REPO_ROOT, capture_output=True,
+                          text=True, timeout=60)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SimulatedDevice needs a pty")
+def test_capture_to_csv(tmp_path):
+    output = tmp_path / "run.csv"
+    with SimulatedDevice(rate=50, boot_time=0.5) as device:
+        result = run_cli("--port", device.path, "--readings", "20", "--settle", "0.2", "--output", str(output))
+    assert result.returncode == 0, result.stderr
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(row["reading"]) for row in rows] == list(range(1, 21))
+
+
+def test_protocol_error_exits_with_status_1():
+    # Nothing answers on loop://, so the banner wait times out with an AcquisitionError
+    result = run_cli("--port", "loop://", "--readings", "5", "--settle", "0")
+    assert result.returncode == 1
+    assert "Error: No calibration banner" in result.stderr
+    assert "Traceback" not in result.stderr
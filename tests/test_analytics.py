@@ -0,0 +1,36 @@
+"""Streaming power, energy and rolling statistics"""
+import random
+import statistics
+
+import pytest
+
+from analytics import RollingStats, StreamingAnalytics
+
+
+def test_rolling_stats_match_the_window():
+    rng = random.Random(3)
+    stats = RollingStats(7)
+    values = []
+    for _ in range(200):
+        value = rng.uniform(-5, 5)
+        values.append(value)
+        stats.update(value)
+        window = values[-7:]
+        assert stats.mean == pytest.approx(statistics.fmean(window))
+        assert stats.min == min(window)
+        assert stats.max == max(window)
+        if len(window) > 1:
+            assert stats.variance == pytest.approx(statistics.variance(window))
+
+
+def test_streaming_analytics_sample_fields():
+    analytics = StreamingAnalytics(window=3)
+    powers = []
+    for i, (voltage, current) in enumerate([(12.0, 0.5), (12.0, 1.0), (10.0, 0.5), (12.0, 2.0)]):
+        power, energy, mean, std, low, high = analytics.update(i * 1_000_000_000, voltage, current)
+        powers.append(power)
+        assert power == voltage * current
+        assert (low, high) == (min(powers[-3:]), max(powers[-3:]))
+        assert mean == pytest.approx(statistics.fmean(powers[-3:]))
+    # Trapezoids between one-second samples: (6 + 12) / 2 + (12 + 5) / 2 + (5 + 24) / 2
+    assert energy == pytest.approx(32.0)
@@ -0,0 +1,20 @@
+"""Online anomaly detectors"""
+from anomaly import ZScoreDetector
+
+
+def test_zscore_alarms_when_warmup_exceeds_window():
+    detector = ZScoreDetector(window=10, threshold=4.5, warmup=50)
+    values = [1.0 + 0.01 * (i % 3) for i in range(60)]
+    assert all(detector.update(value) is None for value in values[:50])
+    assert detector.update(5.0) is not None
+
+
+def test_zscore_reset_restarts_warmup():
+    detector = ZScoreDetector(window=5, threshold=4.5, warmup=8)
+    for i in range(20):
+        detector.update(1.0 + 0.01 * (i % 2))
+    detector.reset()
+    for i in range(7):
+        assert detector.update(1.0 + 0.01 * (i % 2)) is None
+    assert detector.update(5.0) is None
+    assert detector.update(50.0) is not None
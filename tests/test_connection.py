@@ -0,0 +1,81 @@
+"""ConnectionManager against the pty-backed SimulatedDevice"""
+import sys
+import threading
+import time
+
+import pytest
+
+from acquisition import AcquisitionError
+from connection import ConnectionManager
+from simulated_device import SimulatedDevice
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="SimulatedDevice needs a pty")
+
+
+@pytest.fixture
+def device(tmp_path):
+    device = SimulatedDevice(rate=50, boot_time=1.0, link=str(tmp_path / "device"), seed=0)
+    device.start()
+    yield device
+    device.stop()
+
+
+@pytest.fixture
+def connection(device):
+    connection = ConnectionManager(device.path, settle_time=0.5, banner_timeout=4.0, min_backoff=0.1)
+    connection.arm()
+    yield connection
+    connection.close()
+
+
+def test_later_runs_skip_the_banner(device, connection):
+    assert connection.engine(readings=5).run() == 5
+    assert connection.calibration_offset == device.offset_mv
+    started = time.monotonic()
+    assert connection.engine(readings=5).run() == 5
+    assert time.monotonic() - started < 1.0
+    assert device.resets == 1
+
+
+def test_stop_before_banner_does_not_wedge_the_port(device, connection):
+    engine = connection.engine(readings=5)
+    threading.Timer(0.1, engine.stop).start()
+    assert engine.run() == 0
+    time.sleep(1.5)  # the board prints its banner while nobody is reading
+
+    assert connection.engine(readings=5).run() == 5
+    assert connection.calibration_offset == device.offset_mv
+    assert device.resets == 2
+    assert connection.engine(readings=5).run() == 5
+
+
+def test_banner_timeout_resets_the_board_for_the_next_run(device):
+    device.boot_time = 1.5
+    connection = ConnectionManager(device.path, settle_time=0.0, banner_timeout=0.5)
+    try:
+        with pytest.raises(AcquisitionError):
+            connection.engine(readings=5).run()
+        time.sleep(1.5)
+        device.boot_time = 0.1
+        assert connection.engine(readings=5).run() == 5
+        assert device.resets == 2
+    finally:
+        connection.close()
+
+
+def test_unplug_and_replug_mid_run(device, connection):
+    readings = []
+    engine = connection.engine(readings=100, on_sample=readings.append)
+    worker = threading.Thread(target=engine.run)
+    worker.start()
+    while len(readings) < 20:
+        time.sleep(0.01)
+    device.unplug()
+    time.sleep(0.5)
+    device.plug()
+    worker.join(timeout=10)
+
+    assert not worker.is_alive()
+    assert [sample.reading for sample in readings] == list(range(1, 101))
+    assert connection.reconnects >= 1
+    assert connection.calibration_offset == device.offset_mv
@@ -0,0 +1,90 @@
+"""FrameParser against byte streams captured from Dc_Voltage_Current_Measurement.ino"""
+import os
+import random
+
+import pytest
+
+from frame_parser import RESYNC, FrameParser
+
+CAPTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")
+
+# The readings every capture was recorded around, in order
+READINGS = [(12.07, 0.512), (12.05, 0.498), (12.11, 0.507), (11.98, 0.521), (12.02, 0.503), (12.09, 0.495)]
+
+# capture -> (frames, malformed lines)
+EXPECTED = {
+    "clean": (READINGS, 0),
+    "dropped_current": (READINGS[:2] + READINGS[3:], 1),
+    "dropped_separator": (READINGS[:2] + READINGS[3:], 1),
+    "mid_line": (READINGS, 1),
+    "newline_free_noise": (READINGS, 1),
+}
+
+
+def capture(name):
+    with open(os.path.join(CAPTURES, f"{name}.bin"), "rb") as f:
+        return f.read()
+
+
+def feed_chunks(parser, data, cuts):
+    frames = []
+    previous = 0
+    for cut in list(cuts) + [len(data)]:
+        frames += parser.feed(data[previous:cut])
+        previous = cut
+    return frames
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_capture(name):
+    parser = FrameParser()
+    frames = parser.feed(capture(name))
+    expected_frames, expected_malformed = EXPECTED[name]
+    assert frames == expected_frames
+    assert parser.malformed == expected_malformed
+    assert parser.frames == len(expected_frames)
+
+
+def test_clean_stream_reads_calibration():
+    parser = FrameParser()
+    parser.feed(capture("clean"))
+    assert parser.calibration_offset == 2493.16
+
+
+def test_joining_mid_line_after_resync_is_not_malformed():
+    parser = FrameParser()
+    parser.resync()
+    assert parser.feed(capture("mid_line")) == READINGS
+    assert parser.malformed == 0
+
+
+def test_noise_does_not_grow_the_buffer():
+    parser = FrameParser(max_line=64)
+    for _ in range(100):
+        assert parser.feed(b"\xff" * 50) == []
+        assert len(parser._buffer) <= 64 + 50
+    assert parser.malformed == 1
+    assert parser.state == RESYNC
+    assert parser.feed(b"\r\n" + capture("clean")) == READINGS
+    assert parser.malformed == 1
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+@pytest.mark.parametrize("seed", range(20))
+def test_random_chunk_splits(name, seed):
+    data = capture(name)
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(data)), rng.randint(1, len(data) // 4)))
+    parser = FrameParser()
+    expected_frames, expected_malformed = EXPECTED[name]
+    assert feed_chunks(parser, data, cuts) == expected_frames
+    assert parser.malformed == expected_malformed
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_byte_by_byte(name):
+    data = capture(name)
+    parser = FrameParser()
+    expected_frames, expected_malformed = EXPECTED[name]
+    assert feed_chunks(parser, data, range(1, len(data))) == expected_frames
+    assert parser.malformed == expected_malformed
@@ -0,0 +1,32 @@
+"""Concurrent acquisition from several simulated devices"""
+import sys
+
+import pytest
+
+from multi_device import MultiDeviceAcquisition
+from simulated_device import SimulatedDevice
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="SimulatedDevice needs a pty")
+
+
+@pytest.fixture
+def devices(tmp_path):
+    devices = [SimulatedDevice(rate=200, boot_time=0.5, link=str(tmp_path / f"device{i}"), seed=i) for i in range(2)]
+    for device in devices:
+        device.start()
+    yield devices
+    for device in devices:
+        device.stop()
+
+
+def test_progress_status_is_throttled(devices):
+    statuses = []
+    acquisition = MultiDeviceAcquisition([device.path for device in devices], readings=100, settle_time=0.2,
+                                         on_status=lambda channel, text, color: statuses.append((channel, text)))
+    assert acquisition.run() == 200
+    for channel in acquisition.channels:
+        progress = [text for c, text in statuses if c is channel and "Taking reading" in text]
+        assert progress[0] == "Status: Taking reading 1/100..."
+        assert progress[-1] == "Status: Taking reading 100/100..."
+        assert len(progress) < 10
+        assert len(channel.store) == 100
@@ -0,0 +1,75 @@
+"""Min/max rendering of live stores and recorded sessions"""
+import numpy as np
+import pytest
+
+import decimation
+from decimation import MinMaxPyramid
+from Gui_App import render_series
+from sample_store import SAMPLE_DTYPE, SampleStore
+from session_journal import JournalReader, JournalWriter
+from session_replay import SessionView
+
+SAMPLES = 300_001
+SPIKE = 123_457  # not a multiple of the session view's stride, so column() skips it
+
+
+def records(n=SAMPLES, rate=10.0):
+    samples = np.zeros(n, dtype=SAMPLE_DTYPE)
+    samples["reading"] = np.arange(1, n + 1)
+    samples["elapsed"] = np.arange(n) / rate
+    samples["time_ns"] = 1_700_000_000_000_000_000 + np.arange(n) * int(1e9 / rate)
+    samples["voltage"] = 12.0
+    samples["voltage"][SPIKE] = 20.0
+    return samples
+
+
+@pytest.fixture
+def session(tmp_path):
+    path = str(tmp_path / "session.vij")
+    writer = JournalWriter(path, chunk_records=16384)
+    for sample in records().tolist():
+        writer.write(sample)
+    writer.close()
+    reader = JournalReader(path)
+    yield SessionView(reader)
+    reader.close()
+
+
+def test_session_view_keeps_peaks(session):
+    assert session.stride > 1
+    assert session.column("voltage").max() == 12.0  # strided, the spike is lost
+    x, y, limits = render_series(session, "elapsed", "voltage", MinMaxPyramid(), max_points=2000)
+    assert len(y) <= 2100
+    assert y.max() == 20.0
+    assert limits is None
+
+
+def test_window_of_a_session(session):
+    x, y, limits = render_series(session, "elapsed", "voltage", MinMaxPyramid(), window=60, max_points=2000)
+    end = (SAMPLES - 1) / 10.0
+    assert limits == (end - 60, end)
+    assert x.min() >= end - 60.1
+    assert y.max() == 12.0
+
+
+def test_live_store_matches_session(session):
+    store = SampleStore()
+    store.extend(records())
+    live = render_series(store, "reading", "voltage", MinMaxPyramid(), max_points=2000)
+    recorded = render_series(session, "reading", "voltage", MinMaxPyramid(), max_points=2000)
+    np.testing.assert_array_equal(live[0], recorded[0])
+    np.testing.assert_array_equal(live[1], recorded[1])
+
+
+def test_pyramid_update_in_blocks(monkeypatch):
+    values = np.random.default_rng(0).normal(size=10_000)
+    whole = MinMaxPyramid()
+    whole.update(values)
+    monkeypatch.setattr(decimation, "UPDATE_BLOCK", 64)
+    blocked = MinMaxPyramid()
+    blocked.update(values)
+    assert blocked.rows == whole.rows
+    for a, b in zip(whole.levels, blocked.levels):
+        np.testing.assert_array_equal(a.mins[:a.count], b.mins[:b.count])
+        np.testing.assert_array_equal(a.maxs[:a.count], b.maxs[:b.count])
+        np.testing.assert_allclose(a.sums[:a.count], b.sums[:b.count])
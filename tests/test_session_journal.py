@@ -0,0 +1,95 @@
+"""Session journals: writing, lazy range views and replay"""
+import os
+
+import numpy as np
+import pytest
+import serial
+
+from acquisition import AcquisitionEngine
+from sample_store import SAMPLE_DTYPE
+from session_journal import JournalError, JournalReader, JournalWriter, new_journal_path
+from simulated_device import SimulatedDevice, banner_bytes
+from session_replay import SessionReplayer, SessionView
+
+
+def records(n, rate=10.0):
+    samples = np.zeros(n, dtype=SAMPLE_DTYPE)
+    samples["reading"] = np.arange(1, n + 1)
+    samples["elapsed"] = np.arange(n) / rate
+    samples["time_ns"] = 1_700_000_000_000_000_000 + (samples["elapsed"] * 1e9).astype(np.int64)
+    samples["voltage"] = 12.0
+    return samples
+
+
+@pytest.fixture
+def journal(tmp_path):
+    path = str(tmp_path / "session.vij")
+    writer = JournalWriter(path, chunk_records=64)
+    for sample in records(1000).tolist():
+        writer.write(sample)
+    writer.close()
+    reader = JournalReader(path)
+    yield reader
+    reader.close()
+
+
+def test_round_trip(journal):
+    assert len(journal) == 1000
+    assert journal.column("reading").tolist() == list(range(1, 1001))
+    assert journal.verify() == []
+
+
+def test_new_journal_path_is_unique(tmp_path):
+    paths = {new_journal_path(str(tmp_path)) for _ in range(3)}
+    assert len(paths) == 3
+    assert all(os.path.exists(path) for path in paths)
+
+
+@pytest.fixture
+def full_disk_journal(tmp_path):
+    if not os.path.exists("/dev/full"):
+        pytest.skip("needs /dev/full")
+    writer = JournalWriter(str(tmp_path / "session.vij"), chunk_records=4)
+    os.close(writer._data_fd)
+    writer._data_fd = os.open("/dev/full", os.O_WRONLY)  # every write fails with ENOSPC
+    return writer
+
+
+def test_write_failure_is_raised_by_close(full_disk_journal):
+    for sample in records(10).tolist():
+        full_disk_journal.write(sample)
+    with pytest.raises(JournalError):
+        full_disk_journal.close()
+
+
+def test_engine_reports_journal_failure(full_disk_journal):
+    transport = serial.serial_for_url("loop://", timeout=1)
+    transport.write(banner_bytes() + SimulatedDevice().generate(10))
+    engine = AcquisitionEngine(transport, readings=10, settle_time=0.0, sinks=[full_disk_journal])
+    engine.transport.reset_input_buffer = lambda: None  # the frames were queued before the run
+    with pytest.raises(JournalError):
+        engine.run()
+    assert not transport.is_open
+
+
+def test_time_slice(journal):
+    times = journal.column("time_ns")
+    for start, end in [(0, 1000), (600, 1200), (999, 1000), (0, 0), (500, 500)]:
+        start_ns = int(times[0]) + start * 100_000_000
+        end_ns = int(times[0]) + end * 100_000_000
+        expected = slice(int(np.searchsorted(times, start_ns)), int(np.searchsorted(times, end_ns)))
+        assert journal.time_slice(start_ns, end_ns) == expected
+
+
+def test_session_view_range(journal):
+    view = SessionView(journal, 60.0, 80.0)
+    assert len(view) == 200
+    assert view.view()["elapsed"][0] == 60.0
+
+
+def test_replay_numbers_readings_from_one(journal):
+    samples = []
+    view = SessionView(journal, 60.0, 80.0)
+    assert SessionReplayer(view.view(), speed=None, on_sample=samples.append).run() == 200
+    assert [sample.reading for sample in samples] == list(range(1, 201))
+    assert samples[0].elapsed == 60.0
@@ -0,0 +1,46 @@
+"""Incremental Welch spectra"""
+import numpy as np
+
+import spectral
+from sample_store import SAMPLE_DTYPE, SampleStore
+from spectral import IncrementalWelch, SpectralAnalyzer, welch
+
+
+def test_incremental_matches_batch_welch():
+    rate = 100.0
+    t = np.arange(20_000) / rate
+    values = np.sin(2 * np.pi * 5.0 * t) + 0.2 * np.sin(2 * np.pi * 15.0 * t)
+    estimator = IncrementalWelch(segment=256)
+    for begin in range(0, len(values), 333):
+        estimator.update(values[begin:begin + 333])
+    freqs, psd = welch(values, rate, segment=256)
+    np.testing.assert_allclose(estimator.psd(rate)[1], psd)
+    assert freqs[np.argmax(psd)] == 5.078125  # the bin nearest 5 Hz
+
+
+def test_long_input_is_fed_in_blocks(monkeypatch):
+    values = np.random.default_rng(0).normal(size=50_001)
+    whole = IncrementalWelch(segment=64)
+    whole.update(values)
+    monkeypatch.setattr(spectral, "UPDATE_BLOCK", 1000)
+    blocked = IncrementalWelch(segment=64)
+    assert blocked.update(values) == whole.segments
+    np.testing.assert_allclose(blocked.psd(10.0)[1], whole.psd(10.0)[1])
+    np.testing.assert_allclose(blocked.spectrogram(10.0), whole.spectrogram(10.0))
+
+
+def test_backlog_counts_rows_not_yet_analyzed():
+    samples = np.zeros(101, dtype=SAMPLE_DTYPE)
+    samples["time_ns"] = np.arange(101) * 10_000_000
+    store = SampleStore()
+    store.extend(samples[:100])
+    analyzer = SpectralAnalyzer(segment=16)
+    assert analyzer.backlog(store) == 100
+    analyzer.update(store)
+    assert analyzer.backlog(store) == 0
+    store.extend(samples[100:])
+    assert analyzer.backlog(store) == 1
+    store.clear()
+    store.extend(samples[:10])
+    assert analyzer.backlog(store) == 10
+    assert analyzer.backlog(SampleStore()) == 0
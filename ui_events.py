@@ -0,0 +1,73 @@
+"""Thread-safe event bus from acquisition workers to the Tk main loop.
+
+Worker threads never touch widgets. They publish events to an EventBus, and
+the GUI drains the queue on a fixed after() tick. coalesce() folds everything
+that arrived since the last tick into one update: samples become one batch
+per store and only the newest status of each source is kept. The UI cost per
+tick therefore stays flat however fast samples arrive.
+"""
+import queue
+
+# Event kinds and their payloads
+SAMPLE = "sample"  # (store, sample)
+STATUS = "status"  # (source, text, color)
+PROGRESS = "progress"  # (source, count, total)
+DONE = "done"  # (source, succeeded)
+ALARM = "alarm"  # (store, alarm)
+PORTS = "ports"  # (port names,)
+ANALYSIS = "analysis"  # (key, result) of an analysis built on a worker thread, result None if it failed
+
+
+class EventBus:
+    """Unbounded multi-producer queue drained by the UI thread"""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def publish(self, kind, *payload):
+        self._queue.put((kind, payload))
+
+    def drain(self, limit=None):
+        """Return the pending events in arrival order without blocking"""
+        events = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
+class EventBatch:
+    """Result of coalescing one tick's worth of events"""
+
+    def __init__(self):
+        self.samples = {}  # store -> list of samples, in arrival order
+        self.status = {}  # source -> newest (kind, payload) among STATUS/PROGRESS
+        self.done = []  # (source, succeeded) in arrival order
+        self.alarms = []  # (store, alarm) in arrival order, never coalesced away
+        self.ports = None  # newest serial port scan result, if one finished
+        self.analyses = []  # (key, result) in arrival order
+
+    @property
+    def sample_count(self):
+        return sum(len(samples) for samples in self.samples.values())
+
+
+def coalesce(events):
+    batch = EventBatch()
+    for kind, payload in events:
+        if kind == SAMPLE:
+            store, sample = payload
+            batch.samples.setdefault(store, []).append(sample)
+        elif kind in (STATUS, PROGRESS):
+            batch.status[payload[0]] = (kind, payload[1:])
+        elif kind == DONE:
+            batch.done.append(payload)
+        elif kind == ALARM:
+            batch.alarms.append(payload)
+        elif kind == PORTS:
+            batch.ports = payload[0]
+        elif kind == ANALYSIS:
+            batch.analyses.append(payload)
+    return batch